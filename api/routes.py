@@ -1,11 +1,12 @@
 """
 API Routes for video generation
 """
+import asyncio
 import uuid
 from pathlib import Path
 from typing import List
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
+from fastapi.responses import FileResponse, StreamingResponse
 
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -28,6 +29,10 @@ router = APIRouter()
 # In-memory job storage (replace with Redis/DB in production)
 jobs = {}
 
+# Seconds between SSE comments while a job's status doesn't change, so
+# clients and proxies can tell an idle stream from a dead connection
+STREAM_KEEPALIVE = 5
+
 
 def background_generate_video(
     job_id: str,
@@ -197,9 +202,8 @@ async def generate_video_external(
     )
 
 
-@router.get("/status/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
-    """Get job status and progress"""
+def _job_status(job_id: str) -> JobStatusResponse:
+    """Build status response for a job"""
     if job_id not in jobs:
         raise HTTPException(404, f"Job {job_id} not found")
     
@@ -215,10 +219,56 @@ async def get_job_status(job_id: str):
     )
 
 
-@router.get("/download/{job_id}")
-async def download_video(job_id: str):
-    """Download generated video"""
+@router.get("/status/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """Get job status and progress"""
+    return _job_status(job_id)
+
+
+@router.get("/status/{job_id}/stream")
+async def stream_job_status(job_id: str):
+    """Stream job status as server-sent events (one event per change, keepalives between)"""
+    _job_status(job_id)  # 404 before the stream starts
+    
+    async def events():
+        loop = asyncio.get_running_loop()
+        last = None
+        last_sent = loop.time()
+        while True:
+            status = _job_status(job_id)
+            payload = status.model_dump_json()
+            
+            if payload != last:
+                yield f"data: {payload}\n\n"
+                last = payload
+                last_sent = loop.time()
+            elif loop.time() - last_sent >= STREAM_KEEPALIVE:
+                yield ": keepalive\n\n"
+                last_sent = loop.time()
+            
+            if status.status in ('completed', 'failed'):
+                break
+            
+            await asyncio.sleep(0.1)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+def _completed_video_path(job_id: str) -> str:
+    """Video path of a completed job (HTTPException otherwise)"""
     if job_id not in jobs:
+        # Jobs are in memory only - after a restart, finished videos are
+        # still on disk under their job id
+        try:
+            video_path = Path("output") / f"video_{uuid.UUID(job_id)}.mp4"
+        except ValueError:
+            raise HTTPException(404, f"Job {job_id} not found")
+        if video_path.exists():
+            return str(video_path)
         raise HTTPException(404, f"Job {job_id} not found")
     
     job = jobs[job_id]
@@ -230,6 +280,62 @@ async def download_video(job_id: str):
     if not video_path or not Path(video_path).exists():
         raise HTTPException(404, "Video file not found")
     
+    return video_path
+
+
+@router.get("/video/{job_id}")
+async def stream_video(job_id: str, request: Request):
+    """Serve generated video inline with HTTP Range support (for <video> playback)"""
+    video_path = _completed_video_path(job_id)
+    file_size = Path(video_path).stat().st_size
+    
+    range_header = request.headers.get('range')
+    if not range_header:
+        return FileResponse(video_path, media_type="video/mp4", headers={"Accept-Ranges": "bytes"})
+    
+    # Single range only: "bytes=start-end", "bytes=start-" or "bytes=-suffix"
+    try:
+        start_str, end_str = range_header.replace('bytes=', '', 1).split(',')[0].split('-')
+        if start_str:
+            start = int(start_str)
+            end = min(int(end_str), file_size - 1) if end_str else file_size - 1
+        else:
+            start = max(0, file_size - int(end_str))
+            end = file_size - 1
+    except ValueError:
+        raise HTTPException(416, "Invalid range")
+    
+    if start > end or start >= file_size:
+        raise HTTPException(416, "Range not satisfiable")
+    
+    def read_range(chunk_size: int = 1 << 20):
+        with open(video_path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    
+    return StreamingResponse(
+        read_range(),
+        status_code=206,
+        media_type="video/mp4",
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {start}-{end}/{file_size}",
+            "Content-Length": str(end - start + 1),
+        }
+    )
+
+
+@router.get("/download/{job_id}")
+async def download_video(job_id: str):
+    """Download generated video"""
+    video_path = _completed_video_path(job_id)
+    
     return FileResponse(
         video_path,
         media_type="video/mp4",
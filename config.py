@@ -13,6 +13,32 @@ DEFAULT_FPS = 20
 CRF = 23  # Lower = better quality (18-28 range)
 MOVIEPY_PRESET = 'medium'  # veryfast/fast/medium/slow
 
+# Slide clips are stream-copied into the delivered video, so CRF and
+# MOVIEPY_PRESET above set the final quality. Extra libx264 options:
+OUTPUT_TUNE = None  # 'stillimage' only suits videos without Ken Burns motion
+OUTPUT_X264_PARAMS = None  # e.g. 'rc-lookahead=20'
+
+# Encoder for slide clips/transitions: 'auto' probes VAAPI, then NVENC,
+# then falls back to libx264; or force 'h264_vaapi'/'h264_nvenc'/'libx264'
+VIDEO_ENCODER = 'auto'
+VAAPI_DEVICE = '/dev/dri/renderD128'
+LIBVA_DRIVER_NAME = None  # e.g. 'iHD' / 'radeonsi' to skip VA driver probing
+
+# Threads for ffmpeg jobs (None = CPUs this process may run on)
+FFMPEG_THREADS = None
+
+# Keep intermediate clips on tmpfs (/dev/shm) when it has enough free space
+TEMP_ON_TMPFS = True
+TMPFS_BYTES_PER_SECOND = 1024 * 1024  # Size estimate for intermediate clips
+
+# Decode/scale each animated slide image once to raw RGB (Pillow) instead of
+# letting ffmpeg decode the looped image for every frame
+PREDECODE_IMAGES = True
+
+# Render all slide clips with one ffmpeg process (segment muxer) instead
+# of one process per slide in parallel
+SINGLE_PROCESS_SLIDES = False
+
 # Ken Burns settings
 ENABLE_KEN_BURNS = True
 KEN_BURNS_ZOOM_RANGE = (1.0, 1.15)  # Very smooth range
@@ -21,14 +47,24 @@ KEN_BURNS_DIRECTIONS = ["zoom_in", "zoom_out", "pan_left", "pan_right", "pan_up"
 
 # Transition settings
 TRANSITION_DURATION = 0.3
+RENDER_SEED = None  # Set an int for reproducible transition sequences
+# Render all slides + transitions in one ffmpeg pass (built-in xfade
+# transitions only, no intermediate clips)
+SINGLE_PASS_ASSEMBLY = False
 
 # Subtitle settings
 SUBTITLE_FONT_SIZE = 70
+# 'ass' renders all words with one libass subtitles filter, 'drawtext' uses
+# one drawtext filter per word (also the fallback when libass is missing)
+SUBTITLE_RENDERER = 'ass'
 
 # Cache settings
 MIN_SLIDE_DURATION = 5.0
 CACHE_AUTO_CLEANUP = True
 
+# TTS settings
+TTS_MAX_CONCURRENCY = 6  # parallel edge-tts requests per batch
+
 # Whisper settings
 WHISPER_MODEL = "small"
 
@@ -4,7 +4,9 @@ Video Generation Pipeline - isolated business logic
 import uuid
 import time
 import shutil
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Callable
 
@@ -35,11 +37,13 @@ class VideoPipeline:
         file_path = images_dir / filename
         
         logger.info(f"Downloading image: {url}")
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        with open(file_path, 'wb') as f:
-            f.write(response.content)
+        with requests.get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            
+            # Stream to disk in 1 MiB chunks instead of buffering the body
+            with open(file_path, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 20)
         
         logger.info(f"Image downloaded: {filename}")
         return str(file_path)
@@ -59,28 +63,39 @@ class VideoPipeline:
         Returns:
             List of {text, image_path}
         """
-        prepared = []
+        image_paths = [None] * len(slides_data)
+        downloads = {}
         
         for i, slide_data in enumerate(slides_data):
-            if progress_callback:
-                progress_callback(i / len(slides_data) * 0.1, f"Preparing slide {i+1}/{len(slides_data)}")
-            
             # Handle external URL
             if 'image_url' in slide_data and slide_data['image_url']:
                 filename = f"slide_{i}_{uuid.uuid4().hex[:8]}.jpg"
-                image_path = self.download_image(slide_data['image_url'], filename)
+                downloads[i] = (slide_data['image_url'], filename)
             # Handle local path
             elif 'image_path' in slide_data and slide_data['image_path']:
-                image_path = slide_data['image_path']
+                image_paths[i] = slide_data['image_path']
             else:
                 raise ValueError(f"Slide {i}: no image_path or image_url provided")
-            
-            prepared.append({
+        
+        # Downloads are independent I/O - fetch them in parallel
+        if downloads:
+            with ThreadPoolExecutor(max_workers=min(8, len(downloads))) as executor:
+                futures = {
+                    i: executor.submit(self.download_image, url, filename)
+                    for i, (url, filename) in downloads.items()
+                }
+                for done, (i, future) in enumerate(futures.items(), 1):
+                    image_paths[i] = future.result()
+                    if progress_callback:
+                        progress_callback(done / len(futures) * 0.1, f"Downloaded image {done}/{len(futures)}")
+        
+        return [
+            {
                 'text': slide_data['text'],
                 'image_path': image_path
-            })
-        
-        return prepared
+            }
+            for slide_data, image_path in zip(slides_data, image_paths)
+        ]
     
     def generate_audio(
         self,
@@ -103,26 +118,26 @@ class VideoPipeline:
         audio_dir.mkdir(exist_ok=True)
         
         tts_service = TTSService()
+        
+        if progress_callback:
+            progress_callback(0.1, f"Generating audio for {len(slides_data)} slides")
+        
+        logger.info(f"Generating TTS for {len(slides_data)} slides")
+        
+        # All slides are independent - synthesize them concurrently
+        audio_paths = [str(audio_dir / f"slide_{i}.mp3") for i in range(len(slides_data))]
+        durations = tts_service.generate_audio_batch([
+            (slide_data['text'], voice, audio_path)
+            for slide_data, audio_path in zip(slides_data, audio_paths)
+        ])
+        
         slide_objects = []
         
-        for i, slide_data in enumerate(slides_data):
-            if progress_callback:
-                progress = 0.1 + (i / len(slides_data)) * 0.25
-                progress_callback(progress, f"Generating audio {i+1}/{len(slides_data)}")
-            
-            logger.info(f"Generating TTS for slide {i+1}/{len(slides_data)}")
-            
-            audio_path = audio_dir / f"slide_{i}.mp3"
-            duration = tts_service.generate_audio(
-                slide_data['text'],
-                voice,
-                str(audio_path)
-            )
-            
+        for slide_data, audio_path, duration in zip(slides_data, audio_paths, durations):
             slide_obj = Slide(
                 text=slide_data['text'],
                 image_path=slide_data['image_path'],
-                audio_path=str(audio_path),
+                audio_path=audio_path,
                 duration=duration
             )
             slide_objects.append(slide_obj)
@@ -145,17 +160,17 @@ class VideoPipeline:
             List of word lists per slide
         """
         whisper_service = WhisperService()
-        words_per_slide = []
         
-        for i, slide in enumerate(slides):
-            if progress_callback:
-                progress = 0.35 + (i / len(slides)) * 0.25
-                progress_callback(progress, f"Transcribing {i+1}/{len(slides)}")
-            
-            logger.info(f"Transcribing slide {i+1}/{len(slides)}")
-            
-            words = whisper_service.transcribe_with_timestamps(slide.audio_path)
-            words_per_slide.append(words)
+        if progress_callback:
+            progress_callback(0.35, f"Transcribing {len(slides)} slides")
+        
+        logger.info(f"Transcribing {len(slides)} slides in one batch")
+        
+        # One model pass over all slides instead of one per slide
+        words_per_slide = whisper_service.transcribe_batch(
+            [slide.audio_path for slide in slides],
+            [slide.duration for slide in slides]
+        )
         
         return words_per_slide
     
@@ -184,26 +199,41 @@ class VideoPipeline:
             progress_callback(0.6, "Assembling video...")
         
         video_service = VideoService(resolution)
-        video_path = video_service.assemble_video(
-            slides,
-            output_path,
-            words_per_slide
-        )
+        if config.SINGLE_PASS_ASSEMBLY:
+            video_path = video_service.assemble_video_single_pass(
+                slides,
+                output_path,
+                words_per_slide
+            )
+        else:
+            video_path = video_service.assemble_video(
+                slides,
+                output_path,
+                words_per_slide
+            )
         
         if progress_callback:
             progress_callback(1.0, "Video completed!")
         
         return video_path
     
+    def _remove_cache_dir(self):
+        """Remove cache directory (runs in background thread)"""
+        try:
+            shutil.rmtree(self.cache_dir)
+            logger.info(f"Cache cleaned up: {self.generation_id}")
+        except Exception as e:
+            logger.warning(f"Failed to cleanup cache: {e}")
+    
     def cleanup(self):
-        """Clean up cache directory"""
+        """Clean up cache directory without blocking the caller"""
         if config.CACHE_AUTO_CLEANUP:
             if self.cache_dir.exists():
-                try:
-                    shutil.rmtree(self.cache_dir)
-                    logger.info(f"Cache cleaned up: {self.generation_id}")
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup cache: {e}")
+                threading.Thread(
+                    target=self._remove_cache_dir,
+                    name=f"cleanup-{self.generation_id}",
+                    daemon=True
+                ).start()
     
     def generate(
         self,
@@ -2,10 +2,13 @@
 Edge TTS service for text-to-speech generation
 """
 import asyncio
+import subprocess
+import threading
 import edge_tts
+import config
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
-from pydub import AudioSegment
+from typing import List, Dict, Tuple
 from core.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,6 +17,23 @@ logger = get_logger(__name__)
 class TTSService:
     """Service for generating text-to-speech audio using Edge TTS"""
     
+    # Shared event loop running in a background thread (created on first use)
+    _loop = None
+    _loop_lock = threading.Lock()
+    
+    @classmethod
+    def _run(cls, coro):
+        """Run coroutine on the shared event loop and wait for its result"""
+        with cls._loop_lock:
+            if cls._loop is None:
+                cls._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=cls._loop.run_forever,
+                    name="tts-event-loop",
+                    daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coro, cls._loop).result()
+    
     @staticmethod
     async def _get_voices_async() -> List[Dict]:
         """Get available voices from Edge TTS"""
@@ -58,12 +78,7 @@ class TTSService:
             List of voice dictionaries with 'Name' and 'ShortName' keys
         """
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(TTSService.get_voices_async(language))
-            finally:
-                loop.close()
+            return TTSService._run(TTSService.get_voices_async(language))
         except Exception as e:
             logger.error(f"Failed to fetch voices: {e}")
             raise
@@ -95,16 +110,9 @@ class TTSService:
             Path(output_path).parent.mkdir(parents=True, exist_ok=True)
             
             # Generate audio
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                loop.run_until_complete(TTSService._generate_audio_async(text, voice, output_path))
-            finally:
-                loop.close()
+            TTSService._run(TTSService._generate_audio_async(text, voice, output_path))
             
-            # Get duration using pydub
-            audio = AudioSegment.from_file(output_path)
-            duration = len(audio) / 1000.0  # Convert ms to seconds
+            duration = TTSService._get_duration(output_path)
             
             logger.info(f"Audio generated successfully: {duration:.2f}s")
             return duration
@@ -113,6 +121,66 @@ class TTSService:
             logger.error(f"Failed to generate audio: {e}")
             raise
     
+    @staticmethod
+    async def _generate_audio_batch_async(items: List[Tuple[str, str, str]]) -> None:
+        """Generate several audio files concurrently (bounded, fail fast)"""
+        semaphore = asyncio.Semaphore(config.TTS_MAX_CONCURRENCY)
+        
+        async def generate(text: str, voice: str, output_path: str) -> None:
+            async with semaphore:
+                await TTSService._generate_audio_async(text, voice, output_path)
+        
+        tasks = [asyncio.ensure_future(generate(*item)) for item in items]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave queued requests running after the batch failed
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    
+    @staticmethod
+    def generate_audio_batch(items: List[Tuple[str, str, str]]) -> List[float]:
+        """
+        Generate audio for several texts concurrently in one event loop
+        
+        Args:
+            items: List of (text, voice, output_path) tuples
+            
+        Returns:
+            Durations of generated audio in seconds, in input order
+        """
+        try:
+            logger.info(f"Generating TTS audio for {len(items)} items")
+            
+            for _, _, output_path in items:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+            
+            # Generate all audio concurrently on the shared event loop
+            TTSService._run(TTSService._generate_audio_batch_async(items))
+            
+            output_paths = [output_path for _, _, output_path in items]
+            with ThreadPoolExecutor() as executor:
+                durations = list(executor.map(TTSService._get_duration, output_paths))
+            
+            logger.info(f"Audio batch generated successfully: {sum(durations):.2f}s total")
+            return durations
+            
+        except Exception as e:
+            logger.error(f"Failed to generate audio batch: {e}")
+            raise
+    
+    @staticmethod
+    def _get_duration(audio_path: str) -> float:
+        """Get audio duration in seconds from container metadata (no decode)"""
+        cmd = ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+               '-of', 'default=noprint_wrappers=1:nokey=1', audio_path]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffprobe failed for {audio_path}: {result.stderr.strip()}")
+        return float(result.stdout.strip())
+    
     @staticmethod
     async def get_languages_async() -> List[str]:
         """
@@ -138,12 +206,7 @@ class TTSService:
             List of language codes
         """
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                return loop.run_until_complete(TTSService.get_languages_async())
-            finally:
-                loop.close()
+            return TTSService._run(TTSService.get_languages_async())
         except Exception as e:
             logger.error(f"Failed to get languages: {e}")
             return []
\ No newline at end of file
@@ -1,11 +1,16 @@
 """
 Video Service - Pure FFmpeg with Ken Burns, Transitions, and Subtitles (Fixed)
 """
+import math
+import os
 import subprocess
 import tempfile
+import numpy as np
 import shutil
+from PIL import Image, ImageOps
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -21,16 +26,244 @@ logger = get_logger(__name__)
 class VideoService:
     """Fast video generation with FFmpeg - Ken Burns + Transitions + Subtitles"""
     
+    # H.264 encoder picked by _select_encoder (probed once per process)
+    _encoder = None
+    # Whether ffmpeg has the libass subtitles filter (probed once per process)
+    _has_libass = None
+    # CPUs usable by ffmpeg jobs (probed once per process)
+    _cpus = None
+    
     def __init__(self, resolution: Tuple[int, int]):
         self.resolution = resolution
         self.fps = config.DEFAULT_FPS
+        # Known durations of clips we rendered (saves ffprobe calls)
+        self._durations: Dict[str, float] = {}
+        
+        # Command pieces that are fixed for the whole run
+        width, height = resolution
+        self._scale_crop = (
+            f"scale={width}:{height}:force_original_aspect_ratio=increase:flags=lanczos,"
+            f"crop={width}:{height}"
+        )
+        self._encoder_args = self._video_encoder_args()
+        
+        # Pin the VA driver so every ffmpeg child skips driver probing
+        if self._select_encoder() == 'h264_vaapi' and config.LIBVA_DRIVER_NAME:
+            os.environ.setdefault('LIBVA_DRIVER_NAME', config.LIBVA_DRIVER_NAME)
+        self._filter_suffix = self._video_filter_suffix()
+        self._slide_output_args = [
+            *self._encoder_args,
+            # Pad audio so every clip is exactly the requested duration
+            '-af', 'apad',
+            '-c:a', 'aac',
+            '-b:a', '192k',
+        ]
+        
         logger.info(f"VideoService: {resolution[0]}x{resolution[1]} @ {self.fps}fps")
     
+    def get_clip_duration(self, slide: Slide) -> float:
+        """Rendered clip duration for a slide (at least MIN_SLIDE_DURATION, whole frames)"""
+        duration = max(slide.duration, config.MIN_SLIDE_DURATION)
+        return math.ceil(duration * self.fps) / self.fps
+    
+    @classmethod
+    def _select_encoder(cls) -> str:
+        """Pick H.264 encoder: h264_vaapi / h264_nvenc when usable, else libx264"""
+        if cls._encoder is not None:
+            return cls._encoder
+        
+        encoder = config.VIDEO_ENCODER
+        
+        if encoder == 'auto':
+            def probe(cmd):
+                try:
+                    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+                    return result.returncode == 0, result.stdout
+                except Exception:
+                    return False, ""
+            
+            _, encoders = probe(['ffmpeg', '-hide_banner', '-encoders'])
+            
+            if 'h264_vaapi' in encoders and Path(config.VAAPI_DEVICE).exists() and probe(['vainfo'])[0]:
+                encoder = 'h264_vaapi'
+            elif 'h264_nvenc' in encoders and probe(['nvidia-smi'])[0]:
+                encoder = 'h264_nvenc'
+            else:
+                encoder = 'libx264'
+        
+        logger.info(f"Video encoder: {encoder}")
+        cls._encoder = encoder
+        return encoder
+    
+    def _video_encoder_args(self) -> List[str]:
+        """
+        Encoder settings shared by slide clips and transition segments
+        
+        Identical settings keep the streams bitstream-compatible so
+        segments can be joined with the concat demuxer and -c copy. The
+        clips end up in the delivered video as-is, so these use the final
+        output quality settings (config.CRF / MOVIEPY_PRESET).
+        """
+        encoder = self._select_encoder()
+        
+        if encoder == 'h264_vaapi':
+            args = [
+                '-init_hw_device', f'vaapi=va:{config.VAAPI_DEVICE}',
+                '-filter_hw_device', 'va',
+                '-c:v', 'h264_vaapi',
+                '-qp', str(config.CRF),
+            ]
+        elif encoder == 'h264_nvenc':
+            args = [
+                '-c:v', 'h264_nvenc',
+                '-preset', 'p4',
+                '-rc', 'vbr',
+                '-cq', str(config.CRF),
+                '-forced-idr', '1',
+                '-pix_fmt', 'yuv420p',
+            ]
+        else:
+            args = [
+                '-c:v', 'libx264',
+                '-preset', config.MOVIEPY_PRESET,
+                '-crf', str(config.CRF),
+                '-pix_fmt', 'yuv420p',
+            ]
+            
+            if config.OUTPUT_TUNE:
+                args.extend(['-tune', config.OUTPUT_TUNE])
+            if config.OUTPUT_X264_PARAMS:
+                args.extend(['-x264-params', config.OUTPUT_X264_PARAMS])
+        
+        args.extend(['-profile:v', 'high', '-r', str(self.fps)])
+        return args
+    
+    @staticmethod
+    def _cgroup_cpu_limit():
+        """CPUs allowed by the cgroup CPU quota (docker --cpus), None if unlimited"""
+        try:
+            # cgroup v2: "<quota> <period>" or "max <period>"
+            quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()[:2]
+            if quota == 'max':
+                return None
+            quota, period = int(quota), int(period)
+        except (OSError, ValueError):
+            try:
+                # cgroup v1: quota is -1 when unlimited
+                quota = int(Path('/sys/fs/cgroup/cpu/cpu.cfs_quota_us').read_text())
+                period = int(Path('/sys/fs/cgroup/cpu/cpu.cfs_period_us').read_text())
+            except (OSError, ValueError):
+                return None
+        
+        if quota <= 0 or period <= 0:
+            return None
+        return max(1, math.ceil(quota / period))
+    
+    @classmethod
+    def _cpu_count(cls) -> int:
+        """CPUs available for ffmpeg jobs (respects affinity / container pinning and CPU quota)"""
+        if cls._cpus is not None:
+            return cls._cpus
+        
+        if config.FFMPEG_THREADS:
+            cls._cpus = config.FFMPEG_THREADS
+            return cls._cpus
+        
+        try:
+            cpus = len(os.sched_getaffinity(0))
+        except AttributeError:
+            cpus = os.cpu_count() or 2
+        
+        quota_cpus = cls._cgroup_cpu_limit()
+        if quota_cpus is not None:
+            cpus = min(cpus, quota_cpus)
+        
+        # SIMD level decides which x264 asm paths run; a build without asm
+        # is several times slower, so make that visible in the logs
+        flags = set()
+        try:
+            for line in Path('/proc/cpuinfo').read_text().splitlines():
+                if line.startswith('flags'):
+                    flags = set(line.split(':', 1)[1].split())
+                    break
+        except OSError:
+            pass
+        
+        simd = next((f for f in ('avx512f', 'avx2', 'avx', 'sse4_2') if f in flags), 'unknown')
+        
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-buildconf'],
+                capture_output=True, text=True, timeout=10
+            )
+            if '--disable-asm' in result.stdout or '--disable-x86asm' in result.stdout:
+                logger.warning("FFmpeg was built without asm - encoding will be slow")
+        except Exception:
+            pass
+        
+        logger.info(f"CPU: {cpus} usable cores, SIMD: {simd}")
+        cls._cpus = cpus
+        return cpus
+    
+    @classmethod
+    def _use_ass_subtitles(cls) -> bool:
+        """True when subtitles should be rendered with libass instead of drawtext"""
+        if config.SUBTITLE_RENDERER != 'ass':
+            return False
+        
+        if cls._has_libass is None:
+            try:
+                result = subprocess.run(
+                    ['ffmpeg', '-hide_banner', '-filters'],
+                    capture_output=True, text=True, timeout=10
+                )
+                cls._has_libass = ' subtitles ' in result.stdout
+            except Exception:
+                cls._has_libass = False
+            
+            if not cls._has_libass:
+                logger.warning("FFmpeg has no subtitles filter (libass), using drawtext")
+        
+        return cls._has_libass
+    
+    def _video_filter_suffix(self) -> str:
+        """Filters appended to the video graph output for the selected encoder"""
+        if self._select_encoder() == 'h264_vaapi':
+            return ",format=nv12,hwupload"
+        return ""
+    
+    def predecode_image(self, image_path: str, output_path: str) -> str:
+        """
+        Decode, scale and crop an image once to raw RGB at output resolution
+        
+        ffmpeg's looped image input decodes (and we scale) the source again
+        for every frame; a raw file is just read back.
+        
+        Args:
+            image_path: Source image
+            output_path: Raw rgb24 output path
+            
+        Returns:
+            Path to raw frame
+        """
+        with Image.open(image_path) as img:
+            frame = ImageOps.fit(img.convert('RGB'), self.resolution, Image.LANCZOS)
+        
+        with open(output_path, 'wb') as f:
+            f.write(frame.tobytes())
+        
+        return output_path
+    
     def process_slide(
         self,
         slide: Slide,
         output_path: str,
-        words: List[dict] = None
+        words: List[dict] = None,
+        duration: float = None,
+        threads: int = None,
+        keyframes: List[float] = None,
+        raw_image: str = None,
+        kb_params: Dict = None
     ) -> str:
         """
         Process single slide: Ken Burns + Subtitles
@@ -39,78 +272,73 @@ class VideoService:
             slide: Slide object
             output_path: Output video path
             words: Word-level timestamps for subtitles
+            duration: Clip duration (defaults to slide duration clamped to MIN_SLIDE_DURATION)
+            threads: Encoder thread count (ffmpeg default if None)
+            keyframes: Frame indices to force keyframes at (stream-copy cut points)
+            raw_image: Pre-decoded frame from predecode_image (used instead of slide.image_path)
+            kb_params: Ken Burns parameters (random if None)
             
         Returns:
             Path to processed video
         """
-        duration = max(slide.duration, config.MIN_SLIDE_DURATION)
+        if duration is None:
+            duration = self.get_clip_duration(slide)
         
         logger.debug(f"Processing slide: {Path(slide.image_path).name} ({duration:.2f}s)")
         
-        # Build filter chain
-        filter_chain = []
-        
-        # Start with input
-        filter_chain.append("[0:v]")
-        
-        # 1. Scale to COVER resolution with high quality
-        filter_chain.append(
-            f"scale={self.resolution[0]}:{self.resolution[1]}:"
-            f"force_original_aspect_ratio=increase:flags=lanczos,"
-            f"crop={self.resolution[0]}:{self.resolution[1]}"
-        )
-        
-        # 2. Set FPS
-        filter_chain.append(f",fps={self.fps}")
-        
-        # 3. Ken Burns effect (if enabled)
-        if config.ENABLE_KEN_BURNS:
-            kb_filter = KenBurnsEffect.build_filter(
-                duration, 
-                self.fps, 
-                self.resolution
+        if not config.ENABLE_KEN_BURNS and not words:
+            # Static slide: scale the image once and repeat that frame
+            # (loop filter) instead of decoding and scaling every frame
+            frames = round(duration * self.fps)
+            filter_complex = (
+                f"[0:v]{self._scale_crop},loop=loop={frames - 1}:size=1:start=0,"
+                f"setpts=N/({self.fps}*TB){self._filter_suffix}[out]"
             )
-            filter_chain.append(",")
-            filter_chain.append(kb_filter)
-            # Trim to exact duration
-            filter_chain.append(f",trim=duration={duration},setpts=PTS-STARTPTS")
+            image_input = ['-i', slide.image_path]
+        elif raw_image:
+            slide_filter = self._build_slide_filter(
+                duration, words, str(Path(output_path).with_suffix('.ass')), prescaled=True,
+                kb_params=kb_params
+            )
+            filter_complex = f"[0:v]{slide_filter}{self._filter_suffix}[out]"
+            image_input = [
+                '-stream_loop', '-1',
+                '-f', 'rawvideo',
+                '-pixel_format', 'rgb24',
+                '-video_size', f'{self.resolution[0]}x{self.resolution[1]}',
+                '-framerate', str(self.fps),
+                '-t', str(duration),
+                '-i', raw_image,
+            ]
         else:
-            filter_chain.append(",setpts=PTS-STARTPTS")
-        
-        # 4. Subtitles (drawtext - centered)
-        if words:
-            subtitle_filter = SubtitleEffect.build_subtitle_filter(words, self.resolution)
-            if subtitle_filter:
-                filter_chain.append(",")
-                filter_chain.append(subtitle_filter)
-        
-        # End with output label
-        filter_chain.append("[out]")
-        
-        # Join into single filter string
-        filter_complex = "".join(filter_chain)
+            slide_filter = self._build_slide_filter(
+                duration, words, str(Path(output_path).with_suffix('.ass')), kb_params=kb_params
+            )
+            filter_complex = f"[0:v]{slide_filter}{self._filter_suffix}[out]"
+            image_input = [
+                '-loop', '1',
+                '-framerate', str(self.fps),
+                '-t', str(duration),
+                '-i', slide.image_path,
+            ]
         
         # Build FFmpeg command
         cmd = [
             'ffmpeg', '-y',
-            '-loop', '1',
-            '-t', str(duration),
-            '-i', slide.image_path,
+            *image_input,
             '-i', slide.audio_path,
+            '-filter_complex_threads', str(threads or 0),
             '-filter_complex', filter_complex,
             '-map', '[out]',
             '-map', '1:a',
-            '-c:v', 'libx264',
-            '-preset', 'medium',  # Better quality than veryfast
-            '-crf', '18',  # Higher quality (lower CRF)
-            '-pix_fmt', 'yuv420p',
-            '-c:a', 'aac',
-            '-b:a', '192k',
-            '-shortest',
-            '-r', str(self.fps),
-            output_path
+            *self._slide_output_args,
+            '-t', str(duration),
+            '-threads', str(threads or 0),
         ]
         
+        cmd.extend(self._force_keyframes_args(keyframes))
+        cmd.append(output_path)
+        
         # Execute FFmpeg
         result = subprocess.run(
             cmd, 
@@ -123,47 +351,236 @@ class VideoService:
             logger.error(f"FFmpeg stderr: {result.stderr[-1000:]}")
             raise RuntimeError(f"Failed to process slide: {result.returncode}")
         
+        self._durations[output_path] = duration
         return output_path
     
+    def render_slides_single_process(
+        self,
+        slides: List[Slide],
+        temp_dir: Path,
+        words_per_slide: List[List[dict]] = None,
+        durations: List[float] = None,
+        keyframes: List[List[float]] = None,
+        kb_params: List[Dict] = None
+    ) -> List[str]:
+        """
+        Render all slide clips with one ffmpeg process
+        
+        Slides are concatenated inside a single filter graph and split back
+        into per-slide files by the segment muxer, so ffmpeg start-up and
+        encoder initialisation are paid once instead of once per slide.
+        
+        Args:
+            slides: List of Slide objects
+            temp_dir: Directory for slide_XXX.mp4 clips
+            words_per_slide: Word timestamps per slide
+            durations: Clip durations (defaults to get_clip_duration)
+            keyframes: Per-slide keyframe frame indices (relative to each clip)
+            kb_params: Per-slide Ken Burns parameters (random if None)
+            
+        Returns:
+            Paths to rendered clips, in slide order
+        """
+        if durations is None:
+            durations = [self.get_clip_duration(slide) for slide in slides]
+        
+        cmd = ['ffmpeg', '-y']
+        graph = []
+        concat_inputs = []
+        split_frames = []
+        forced_keyframes = []
+        position = 0
+        
+        for i, (slide, duration) in enumerate(zip(slides, durations)):
+            cmd.extend([
+                '-loop', '1',
+                '-framerate', str(self.fps),
+                '-t', str(duration),
+                '-i', slide.image_path,
+                '-i', slide.audio_path
+            ])
+            
+            words = words_per_slide[i] if words_per_slide and i < len(words_per_slide) else None
+            subtitle_path = str(temp_dir / f"slide_{i:03d}.ass")
+            slide_filter = self._build_slide_filter(
+                duration, words, subtitle_path, kb_params=kb_params[i] if kb_params else None
+            )
+            graph.append(
+                f"[{2*i}:v]{slide_filter},"
+                f"format=yuv420p,settb=AVTB[v{i}]"
+            )
+            graph.append(
+                f"[{2*i+1}:a]apad,atrim=end={duration},asetpts=PTS-STARTPTS[a{i}]"
+            )
+            concat_inputs.append(f"[v{i}][a{i}]")
+            
+            # Slide boundaries and cut points must land on keyframes
+            if i > 0:
+                split_frames.append(position)
+            if keyframes:
+                forced_keyframes.extend(position + n for n in keyframes[i])
+            position += round(duration * self.fps)
+        
+        graph.append(f"{''.join(concat_inputs)}concat=n={len(slides)}:v=1:a=1[vcat][aout]")
+        graph.append(f"[vcat]null{self._filter_suffix}[vout]")
+        
+        filter_script = temp_dir / "slides.filter.txt"
+        filter_script.write_text(";\n".join(graph), encoding='utf-8')
+        
+        cmd.extend([
+            '-filter_complex_script', str(filter_script),
+            '-map', '[vout]',
+            '-map', '[aout]',
+            *self._encoder_args,
+            '-threads', str(self._cpu_count()),
+            '-c:a', 'aac',
+            '-b:a', '192k',
+        ])
+        
+        cmd.extend(self._force_keyframes_args(split_frames + forced_keyframes))
+        
+        # The segment muxer splits at the first keyframe at or after each
+        # time, so aim a quarter frame early to never skip to the next one
+        split_times = [(n - 0.25) / self.fps for n in split_frames]
+        
+        cmd.extend([
+            '-f', 'segment',
+            '-segment_format', 'mp4',
+            '-segment_times', ','.join(f"{t:.6f}" for t in split_times) or str(position / self.fps),
+            '-reset_timestamps', '1',
+            str(temp_dir / "slide_%03d.mp4")
+        ])
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=300 * len(slides)
+            )
+        finally:
+            filter_script.unlink(missing_ok=True)
+        
+        if result.returncode != 0:
+            logger.error(f"FFmpeg stderr: {result.stderr[-1000:]}")
+            raise RuntimeError(f"Failed to render slides: {result.returncode}")
+        
+        clips = [str(temp_dir / f"slide_{i:03d}.mp4") for i in range(len(slides))]
+        for clip, duration in zip(clips, durations):
+            self._durations[clip] = duration
+        
+        return clips
+    
+    def _build_slide_filter(
+        self,
+        duration: float,
+        words: List[dict] = None,
+        subtitle_path: str = None,
+        prescaled: bool = False,
+        kb_params: Dict = None
+    ) -> str:
+        """
+        Build per-slide video filter chain (without input/output labels)
+        
+        Args:
+            duration: Clip duration
+            words: Word-level timestamps for subtitles
+            subtitle_path: Where to write the .ass file when rendering with libass
+            prescaled: Input is already scaled/cropped to the output resolution
+            kb_params: Ken Burns parameters (random if None)
+            
+        Returns:
+            Comma-separated filter chain
+        """
+        filter_chain = []
+        
+        # 1. Scale to COVER resolution with high quality
+        # (pre-decoded raw input is already at target size - pass through)
+        filter_chain.append("null" if prescaled else self._scale_crop)
+        
+        # 2. Ken Burns effect (if enabled)
+        # The looped image input already runs at self.fps and zoompan emits
+        # frames at that rate, so no separate fps node is needed here
+        if config.ENABLE_KEN_BURNS:
+            kb_filter = KenBurnsEffect.build_filter(
+                duration, 
+                self.fps, 
+                self.resolution,
+                kb_params
+            )
+            filter_chain.append(",")
+            filter_chain.append(kb_filter)
+            # Trim to exact duration
+            filter_chain.append(f",trim=duration={duration},setpts=PTS-STARTPTS")
+        else:
+            filter_chain.append(f",fps={self.fps},setpts=PTS-STARTPTS")
+        
+        # 3. Subtitles (libass when available - one filter instead of a
+        # drawtext per word; drawtext otherwise - centered)
+        if words and subtitle_path and self._use_ass_subtitles():
+            if SubtitleEffect.create_ass_file(words, subtitle_path, self.resolution):
+                escaped = subtitle_path.replace('\\', '/').replace("'", "\\'").replace(':', '\\:')
+                filter_chain.append(f",subtitles=filename='{escaped}'")
+        elif words:
+            subtitle_filter = SubtitleEffect.build_subtitle_filter(words, self.resolution)
+            if subtitle_filter:
+                filter_chain.append(",")
+                filter_chain.append(subtitle_filter)
+        
+        # Join into single filter string
+        return "".join(filter_chain)
+    
     def apply_transition(
         self,
         clip1_path: str,
         clip2_path: str,
         output_path: str,
-        transition_duration: float = None
+        transition_duration: float = None,
+        transition: str = None,
+        video_args: List[str] = None,
+        video_filter: str = '',
+        params: Dict = None,
+        audio: bool = True
     ) -> str:
-        """Apply random custom transition"""
+        """Apply custom transition (random one and random params if not specified)"""
         if transition_duration is None:
             transition_duration = getattr(config, 'TRANSITION_DURATION', 0.3)
         
-        # Get RANDOM transition each time
-        transition = CustomTransitions.get_random_transition()
+        if transition is None:
+            transition = CustomTransitions.get_random_transition()
+        
+        logger.info(f"Applying '{transition}' transition")
         
-        logger.info(f"Applying '{transition}' transition (random)")
+        clip1_duration = self._durations.get(clip1_path)
         
         try:
             if transition == 'glitch':
                 return CustomTransitions.apply_glitch_transition(
-                    clip1_path, clip2_path, output_path, transition_duration
+                    clip1_path, clip2_path, output_path, transition_duration, video_args, video_filter,
+                    clip1_duration, params, audio
                 )
             elif transition == 'flash':
                 return CustomTransitions.apply_flash_transition(
-                    clip1_path, clip2_path, output_path, transition_duration
+                    clip1_path, clip2_path, output_path, transition_duration, video_args, video_filter,
+                    clip1_duration, audio
                 )
             elif transition == 'zoom_punch':
                 return CustomTransitions.apply_zoom_punch_transition(
-                    clip1_path, clip2_path, output_path, transition_duration
+                    clip1_path, clip2_path, output_path, transition_duration, video_args, video_filter,
+                    clip1_duration, params, audio
                 )
             else:
                 logger.warning(f"Unknown transition: {transition}, using fade")
                 return self._apply_simple_fade(
-                    clip1_path, clip2_path, output_path, transition_duration
+                    clip1_path, clip2_path, output_path, transition_duration, video_args, video_filter,
+                    clip1_duration, audio
                 )
         except Exception as e:
             logger.error(f"Transition '{transition}' failed: {e}")
             logger.info("Falling back to simple fade")
             return self._apply_simple_fade(
-                clip1_path, clip2_path, output_path, transition_duration
+                clip1_path, clip2_path, output_path, transition_duration, video_args, video_filter,
+                clip1_duration, audio
             )
     
     def _apply_simple_fade(
@@ -171,7 +588,11 @@ class VideoService:
         clip1_path: str,
         clip2_path: str,
         output_path: str,
-        duration: float
+        duration: float,
+        video_args: List[str] = None,
+        video_filter: str = '',
+        clip1_duration: float = None,
+        audio: bool = True
     ) -> str:
         """Simple fade transition (fallback)"""
         def get_duration(path):
@@ -180,25 +601,32 @@ class VideoService:
             result = subprocess.run(cmd, capture_output=True, text=True)
             return float(result.stdout.strip())
         
-        clip1_dur = get_duration(clip1_path)
+        clip1_dur = clip1_duration if clip1_duration is not None else get_duration(clip1_path)
         offset = clip1_dur - duration
         
         filter_complex = (
-            f"[0:v][1:v]xfade=transition=fade:duration={duration}:offset={offset}[v]"
+            f"[0:v][1:v]xfade=transition=fade:duration={duration}:offset={offset}{video_filter}[v]"
         )
         
+        if audio:
+            filter_complex += f";[0:a][1:a]acrossfade=d={duration}[a]"
+            audio_args = ['-map', '[a]', '-c:a', 'aac']
+        else:
+            audio_args = ['-an']
+        
         cmd = [
             'ffmpeg', '-y',
             '-i', clip1_path,
             '-i', clip2_path,
-            '-filter_complex', f"{filter_complex};[0:a][1:a]acrossfade=d={duration}[a]",
+            '-filter_complex', filter_complex,
             '-map', '[v]',
-            '-map', '[a]',
-            '-c:v', 'libx264',
-            '-preset', config.MOVIEPY_PRESET,
-            '-crf', str(config.CRF),
-            '-pix_fmt', 'yuv420p',
-            '-c:a', 'aac',
+            *(video_args or [
+                '-c:v', 'libx264',
+                '-preset', config.MOVIEPY_PRESET,
+                '-crf', str(config.CRF),
+                '-pix_fmt', 'yuv420p'
+            ]),
+            *audio_args,
             output_path
         ]
         
@@ -209,6 +637,108 @@ class VideoService:
         
         return output_path
     
+    def _force_keyframes_args(self, frames: List[int]) -> List[str]:
+        """
+        -force_key_frames by frame index
+        
+        Millisecond-rounded times land after the frame for fps like 24/30,
+        which moves the keyframe one frame late; frame numbers are exact.
+        """
+        if not frames:
+            return []
+        return ['-force_key_frames', 'expr:' + '+'.join(f"eq(n,{n})" for n in sorted(set(frames)))]
+    
+    def _cut_clip(self, clip_path: str, output_path: str, start_frame: int, end_frame: int) -> str:
+        """
+        Cut frames [start_frame, end_frame) out of a clip without re-encoding (start must be a keyframe)
+        
+        Video only: audio is rebuilt by _concat_with_audio, and an audio
+        track running past the last frame would lengthen the segment in
+        the concat demuxer and shift everything after it.
+        """
+        # Seek a quarter frame past the keyframe: never before it (that
+        # would copy from the previous keyframe) and short of the next frame
+        start = (start_frame + 0.25) / self.fps
+        
+        cmd = [
+            'ffmpeg', '-y',
+            '-ss', f"{start:.6f}",
+            '-i', clip_path,
+            '-map', '0:v:0',
+            '-an',
+            '-frames:v', str(end_frame - start_frame),
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            output_path
+        ]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        
+        if result.returncode != 0:
+            logger.error(f"Cut error: {result.stderr[-1000:]}")
+            raise RuntimeError(f"Failed to cut clip: {result.returncode}")
+        
+        self._durations[output_path] = (end_frame - start_frame) / self.fps
+        return output_path
+    
+    def _render_transition_segments(
+        self,
+        clips: List[str],
+        frames: List[int],
+        transitions: List[str],
+        window: int,
+        transition_duration: float,
+        temp_dir: Path,
+        transition_params: List[Dict] = None
+    ) -> List[str]:
+        """
+        Split clips into stream-copied bodies and re-encoded transition joints
+        
+        Only the last `window` frames of clip A and the first `window`
+        frames of clip B are re-encoded per cut; everything in between is
+        cut with -c copy. Joints don't depend on each other, so they are
+        rendered in parallel. Returns the (video) segments in playback order.
+        """
+        def render_joint(i: int) -> str:
+            tail = self._cut_clip(
+                clips[i - 1], str(temp_dir / f"tail_{i-1:03d}.mp4"),
+                frames[i - 1] - window, frames[i - 1]
+            )
+            head = self._cut_clip(
+                clips[i], str(temp_dir / f"head_{i:03d}.mp4"), 0, window
+            )
+            joint = self.apply_transition(
+                tail,
+                head,
+                str(temp_dir / f"joint_{i:03d}.mp4"),
+                transition_duration=transition_duration,
+                transition=transitions[i - 1],
+                video_args=self._encoder_args,
+                video_filter=self._filter_suffix,
+                params=transition_params[i - 1] if transition_params else None,
+                audio=False
+            )
+            logger.info(f"Transition {i}/{len(clips)-1}")
+            return joint
+        
+        workers = max(1, min(len(clips) - 1, self._cpu_count() // 2))
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            joints = {i: executor.submit(render_joint, i) for i in range(1, len(clips))}
+            
+            segments = []
+            for i, clip in enumerate(clips):
+                if i > 0:
+                    segments.append(joints[i].result())
+                
+                start = window if i > 0 else 0
+                end = frames[i] - window if i < len(clips) - 1 else frames[i]
+                segments.append(
+                    self._cut_clip(clip, str(temp_dir / f"body_{i:03d}.mp4"), start, end)
+                )
+        
+        return segments
+    
     def concatenate_videos(self, video_paths: List[str], output_path: str) -> str:
         """Concatenate videos without transitions (fallback)"""
         concat_file = str(output_path).replace('.mp4', '_concat.txt')
@@ -241,13 +771,116 @@ class VideoService:
         
         return output_path
     
+    def _concat_with_audio(
+        self,
+        video_paths: List[str],
+        slides: List[Slide],
+        durations: List[float],
+        output_path: str,
+        crossfade: float = 0.0
+    ) -> str:
+        """
+        Join video segments with -c copy and lay one continuous audio track over them
+        
+        Stream-copied AAC can only be cut on packet boundaries and every
+        re-encode adds encoder priming, so segment audio is dropped; the
+        slide audio is padded to each clip, crossfaded where the video
+        crossfades, and encoded once in this pass.
+        
+        Args:
+            video_paths: Video segments in playback order
+            slides: Slides (audio sources)
+            durations: Clip duration per slide
+            output_path: Output video path
+            crossfade: Overlap between consecutive slides (0 = hard cuts)
+        """
+        concat_file = str(output_path).replace('.mp4', '_concat.txt')
+        
+        with open(concat_file, 'w') as f:
+            for path in video_paths:
+                f.write(f"file '{Path(path).absolute()}'\n")
+        
+        cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', concat_file]
+        graph = []
+        
+        for i, (slide, duration) in enumerate(zip(slides, durations)):
+            cmd.extend(['-i', slide.audio_path])
+            graph.append(f"[{i+1}:a]apad,atrim=end={duration},asetpts=PTS-STARTPTS[a{i}]")
+        
+        if len(slides) == 1:
+            audio_label = "a0"
+        elif crossfade:
+            audio_label = "a0"
+            for i in range(1, len(slides)):
+                graph.append(f"[{audio_label}][a{i}]acrossfade=d={crossfade}[ax{i}]")
+                audio_label = f"ax{i}"
+        else:
+            inputs = ''.join(f"[a{i}]" for i in range(len(slides)))
+            graph.append(f"{inputs}concat=n={len(slides)}:v=0:a=1[acat]")
+            audio_label = "acat"
+        
+        cmd.extend([
+            '-filter_complex', ';'.join(graph),
+            '-map', '0:v',
+            '-map', f'[{audio_label}]',
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-b:a', '192k',
+            output_path
+        ])
+        
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=600)
+        finally:
+            Path(concat_file).unlink(missing_ok=True)
+        
+        if result.returncode != 0:
+            logger.error(f"Concatenation error: {result.stderr[-1000:]}")
+            raise RuntimeError(f"Failed to concatenate: {result.returncode}")
+        
+        return output_path
+    
+    def _make_temp_dir(self, output_path: str, total_duration: float, extra_bytes: int = 0) -> Path:
+        """
+        Directory for intermediate clips
+        
+        Uses tmpfs (/dev/shm) when it has room for the clips with margin
+        plus `extra_bytes` (pre-decoded raw frames), so slides, cuts and
+        joints never touch the disk; otherwise falls back to temp_clips
+        next to the output.
+        """
+        shm = Path('/dev/shm')
+        
+        if config.TEMP_ON_TMPFS and shm.is_dir():
+            # Clips, cut pieces and joints together stay well under 3x the
+            # encoded size of the video
+            needed = 3 * total_duration * config.TMPFS_BYTES_PER_SECOND + extra_bytes
+            try:
+                if shutil.disk_usage(shm).free > needed:
+                    return Path(tempfile.mkdtemp(prefix='ibelieve_', dir=shm))
+            except OSError as e:
+                logger.debug(f"tmpfs unavailable: {e}")
+        
+        temp_dir = Path(output_path).parent / "temp_clips"
+        temp_dir.mkdir(exist_ok=True)
+        return temp_dir
+    
     def assemble_video(
         self,
         slides: List[Slide],
         output_path: str,
-        words_per_slide: List[List[dict]] = None
+        words_per_slide: List[List[dict]] = None,
+        seed: int = None
     ) -> str:
-        """Assemble video with Ken Burns + Transitions + Subtitles"""
+        """
+        Assemble video with Ken Burns + Transitions + Subtitles
+        
+        Args:
+            slides: List of Slide objects
+            output_path: Output video path
+            words_per_slide: Word timestamps per slide
+            seed: Seed for Ken Burns moves and transitions (defaults to config.RENDER_SEED)
+        """
         logger.info(f"Assembling video: {len(slides)} slides")
         
         try:
@@ -261,57 +894,107 @@ class VideoService:
                 if not Path(slide.audio_path).exists():
                     raise FileNotFoundError(f"Audio not found: {slide.audio_path}")
             
+            # Compute clip durations once so filters and -t always agree
+            durations = [self.get_clip_duration(slide) for slide in slides]
+            
+            # Draw every random choice up front in slide order, so a seed
+            # gives the same video however the parallel jobs get scheduled
+            rng = np.random.default_rng(seed if seed is not None else config.RENDER_SEED)
+            kb_params = [KenBurnsEffect.generate_params(rng) for _ in slides]
+            transitions = [CustomTransitions.get_random_transition(rng) for _ in slides[1:]]
+            transition_params = [CustomTransitions.generate_params(t, rng) for t in transitions]
+            
+            # Animated slides get a raw W x H x 3 frame each (predecode_image)
+            predecode = [
+                config.PREDECODE_IMAGES and not config.SINGLE_PROCESS_SLIDES and bool(
+                    config.ENABLE_KEN_BURNS or (words_per_slide and i < len(words_per_slide) and words_per_slide[i])
+                )
+                for i in range(len(slides))
+            ]
+            width, height = self.resolution
+            raw_bytes = sum(predecode) * width * height * 3
+            
             # Create temp directory
-            temp_dir = Path(output_path).parent / "temp_clips"
-            temp_dir.mkdir(exist_ok=True)
+            temp_dir = self._make_temp_dir(output_path, sum(durations), raw_bytes)
             
-            # Step 1: Process each slide with Ken Burns and subtitles
-            logger.info("Step 1: Processing slides...")
-            processed_clips = []
+            # Transitions re-encode only `window` frames around each cut, so
+            # slide clips need keyframes exactly at those cut points. The
+            # transition is a whole number of frames so the audio crossfade
+            # matches the video overlap exactly.
+            use_transitions = len(slides) > 1 and hasattr(config, 'TRANSITION_DURATION')
+            frames = [round(d * self.fps) for d in durations]
+            transition_duration = max(1, round(config.TRANSITION_DURATION * self.fps)) / self.fps
+            window = math.ceil(2 * transition_duration * self.fps) if use_transitions else 0
+            keyframes = [
+                ([window] if use_transitions and i > 0 else []) +
+                ([frames[i] - window] if use_transitions and i < len(slides) - 1 else [])
+                for i in range(len(slides))
+            ]
             
-            for i, slide in enumerate(slides):
-                logger.info(f"Processing slide {i+1}/{len(slides)}")
+            # Step 1: Process slides with Ken Burns and subtitles
+            if config.SINGLE_PROCESS_SLIDES:
+                logger.info("Step 1: Processing slides (single ffmpeg process)...")
+                processed_clips = self.render_slides_single_process(
+                    slides, temp_dir, words_per_slide, durations, keyframes, kb_params
+                )
+            else:
+                # Each slide is an independent ffmpeg job, so threads are enough
+                cpu_count = self._cpu_count()
+                workers = max(1, min(len(slides), cpu_count // 2))
+                threads_per_job = max(1, cpu_count // workers)
                 
-                temp_clip = temp_dir / f"slide_{i:03d}.mp4"
-                words = words_per_slide[i] if words_per_slide and i < len(words_per_slide) else None
+                logger.info(f"Step 1: Processing slides ({workers} workers x {threads_per_job} threads)...")
+                processed_clips = [str(temp_dir / f"slide_{i:03d}.mp4") for i in range(len(slides))]
                 
-                self.process_slide(slide, str(temp_clip), words)
-                processed_clips.append(str(temp_clip))
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # Animated slides read their image every frame - decode it once
+                    raw_images = [None] * len(slides)
+                    pending = {
+                        i: executor.submit(
+                            self.predecode_image, slide.image_path, str(temp_dir / f"slide_{i:03d}.rgb")
+                        )
+                        for i, slide in enumerate(slides) if predecode[i]
+                    }
+                    for i, future in pending.items():
+                        raw_images[i] = future.result()
+                    
+                    futures = {}
+                    for i, slide in enumerate(slides):
+                        words = words_per_slide[i] if words_per_slide and i < len(words_per_slide) else None
+                        futures[i] = executor.submit(
+                            self.process_slide,
+                            slide,
+                            processed_clips[i],
+                            words,
+                            durations[i],
+                            threads_per_job,
+                            keyframes[i],
+                            raw_images[i],
+                            kb_params[i]
+                        )
+                    
+                    for i, future in futures.items():
+                        future.result()
+                        logger.info(f"Processed slide {i+1}/{len(slides)}")
             
             # Step 2: Apply transitions between clips
-            if len(processed_clips) > 1 and hasattr(config, 'TRANSITION_DURATION'):
+            if use_transitions:
                 logger.info("Step 2: Applying transitions...")
                 
-                current_clip = processed_clips[0]
-                
-                for i in range(1, len(processed_clips)):
-                    logger.info(f"Transition {i}/{len(processed_clips)-1}")
+                try:
+                    segments = self._render_transition_segments(
+                        processed_clips, frames, transitions, window, transition_duration, temp_dir,
+                        transition_params
+                    )
+                    self._concat_with_audio(
+                        segments, slides, durations, output_path, transition_duration
+                    )
                     
-                    merged_clip = temp_dir / f"merged_{i:03d}.mp4"
+                except Exception as e:
+                    logger.warning(f"Transition failed: {e}")
+                    logger.info("Falling back to concatenation")
                     
-                    try:
-                        self.apply_transition(
-                            current_clip,
-                            processed_clips[i],
-                            str(merged_clip)
-                        )
-                        
-                        if i > 1:
-                            Path(current_clip).unlink(missing_ok=True)
-                        
-                        current_clip = str(merged_clip)
-                        
-                    except Exception as e:
-                        logger.warning(f"Transition failed: {e}")
-                        logger.info("Falling back to concatenation")
-                        
-                        remaining_clips = [current_clip] + processed_clips[i:]
-                        self.concatenate_videos(remaining_clips, output_path)
-                        
-                        shutil.rmtree(temp_dir, ignore_errors=True)
-                        return output_path
-                
-                shutil.move(current_clip, output_path)
+                    self._concat_with_audio(processed_clips, slides, durations, output_path)
                 
             else:
                 logger.info("Step 2: Concatenating clips (no transitions)...")
@@ -319,7 +1002,7 @@ class VideoService:
                 if len(processed_clips) == 1:
                     shutil.move(processed_clips[0], output_path)
                 else:
-                    self.concatenate_videos(processed_clips, output_path)
+                    self._concat_with_audio(processed_clips, slides, durations, output_path)
             
             # Cleanup temp directory
             shutil.rmtree(temp_dir, ignore_errors=True)
@@ -339,4 +1022,132 @@ class VideoService:
             if 'temp_dir' in locals():
                 shutil.rmtree(temp_dir, ignore_errors=True)
             
-            raise
\ No newline at end of file
+            raise
+    
+    def assemble_video_single_pass(
+        self,
+        slides: List[Slide],
+        output_path: str,
+        words_per_slide: List[List[dict]] = None,
+        seed: int = None
+    ) -> str:
+        """
+        Assemble video with a single ffmpeg invocation
+        
+        Every slide gets its own Ken Burns + subtitle chain inside one
+        filter graph, joined with xfade/acrossfade, so the video is encoded
+        exactly once and no intermediate clips are written.
+        
+        Args:
+            slides: List of Slide objects
+            output_path: Output video path
+            words_per_slide: Word timestamps per slide
+            seed: Seed for Ken Burns moves and transitions (defaults to config.RENDER_SEED)
+        """
+        logger.info(f"Assembling video (single pass): {len(slides)} slides")
+        
+        if not slides:
+            raise ValueError("No slides provided")
+        
+        # Validate inputs
+        for slide in slides:
+            if not Path(slide.image_path).exists():
+                raise FileNotFoundError(f"Image not found: {slide.image_path}")
+            if not Path(slide.audio_path).exists():
+                raise FileNotFoundError(f"Audio not found: {slide.audio_path}")
+        
+        durations = [self.get_clip_duration(slide) for slide in slides]
+        transition_duration = getattr(config, 'TRANSITION_DURATION', 0.3)
+        
+        rng = np.random.default_rng(seed if seed is not None else config.RENDER_SEED)
+        kb_params = [KenBurnsEffect.generate_params(rng) for _ in slides]
+        transitions = [CustomTransitions.get_random_transition(rng) for _ in slides[1:]]
+        
+        cmd = ['ffmpeg', '-y']
+        graph = []
+        subtitle_files = []
+        
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        # Per-slide chains: image -> [v{i}], audio padded to clip length -> [a{i}]
+        for i, (slide, duration) in enumerate(zip(slides, durations)):
+            cmd.extend([
+                '-loop', '1',
+                '-framerate', str(self.fps),
+                '-t', str(duration),
+                '-i', slide.image_path,
+                '-i', slide.audio_path
+            ])
+            
+            words = words_per_slide[i] if words_per_slide and i < len(words_per_slide) else None
+            subtitle_path = Path(output_path).with_suffix(f'.{i:03d}.ass')
+            subtitle_files.append(subtitle_path)
+            slide_filter = self._build_slide_filter(
+                duration, words, str(subtitle_path), kb_params=kb_params[i]
+            )
+            graph.append(
+                f"[{2*i}:v]{slide_filter},"
+                f"format=yuv420p,settb=AVTB[v{i}]"
+            )
+            graph.append(
+                f"[{2*i+1}:a]apad,atrim=end={duration},asetpts=PTS-STARTPTS[a{i}]"
+            )
+        
+        # Chain transitions: xfade offsets follow the running output length
+        video_label, audio_label = "v0", "a0"
+        total = durations[0]
+        
+        for i in range(1, len(slides)):
+            offset = total - transition_duration
+            xfade = CustomTransitions.XFADE_EQUIVALENTS.get(transitions[i - 1], 'fade')
+            
+            graph.append(
+                f"[{video_label}][v{i}]xfade=transition={xfade}:"
+                f"duration={transition_duration}:offset={offset:.3f}[vx{i}]"
+            )
+            graph.append(
+                f"[{audio_label}][a{i}]acrossfade=d={transition_duration}[ax{i}]"
+            )
+            
+            video_label, audio_label = f"vx{i}", f"ax{i}"
+            total += durations[i] - transition_duration
+        
+        # Graph can exceed the per-argument size limit with many subtitle words
+        filter_script = Path(output_path).with_suffix('.filter.txt')
+        filter_script.write_text(";\n".join(graph), encoding='utf-8')
+        
+        cmd.extend([
+            '-filter_complex_script', str(filter_script),
+            '-map', f'[{video_label}]',
+            '-map', f'[{audio_label}]',
+            '-c:v', 'libx264',
+            '-preset', config.MOVIEPY_PRESET,
+            '-crf', str(config.CRF),
+            '-pix_fmt', 'yuv420p',
+            '-c:a', 'aac',
+            '-b:a', '192k',
+            '-r', str(self.fps),
+            '-movflags', '+faststart',
+            output_path
+        ])
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=300 * len(slides)
+            )
+        finally:
+            filter_script.unlink(missing_ok=True)
+            for subtitle_path in subtitle_files:
+                subtitle_path.unlink(missing_ok=True)
+        
+        if result.returncode != 0:
+            logger.error(f"FFmpeg stderr: {result.stderr[-1000:]}")
+            raise RuntimeError(f"Failed to assemble video: {result.returncode}")
+        
+        file_size = Path(output_path).stat().st_size / (1024 * 1024)
+        logger.info(f"✓ Video assembled (single pass, {total:.2f}s): {file_size:.2f} MB")
+        
+        return output_path
@@ -1,6 +1,10 @@
 """
 Whisper service for speech-to-text with word-level timestamps
 """
+import bisect
+import os
+import subprocess
+import tempfile
 from faster_whisper import WhisperModel
 from typing import List, Dict
 from core.utils.logger import get_logger
@@ -12,6 +16,9 @@ logger = get_logger(__name__)
 class WhisperService:
     """Service for transcribing audio with word-level timestamps"""
     
+    # Silence inserted between slides so no word straddles a slide boundary
+    BATCH_GAP = 0.5
+    
     def __init__(self, model_size: str = config.WHISPER_MODEL):
         """
         Initialize Whisper service
@@ -71,4 +78,76 @@ class WhisperService:
             
         except Exception as e:
             logger.error(f"Failed to transcribe audio: {e}")
-            raise
\ No newline at end of file
+            raise
+    
+    def transcribe_batch(self, audio_paths: List[str], durations: List[float]) -> List[List[Dict]]:
+        """
+        Transcribe several audio files in a single model pass
+        
+        The files are joined into one mono track (each padded to its
+        duration plus BATCH_GAP of silence), transcribed once, and the
+        words are split back per file using the known offsets.
+        
+        Args:
+            audio_paths: Paths to audio files
+            durations: Duration of each audio file in seconds
+            
+        Returns:
+            List of word lists (with 'word', 'start', 'end' keys) per file
+        """
+        if not audio_paths:
+            return []
+        
+        offsets = []
+        filter_parts = []
+        position = 0.0
+        
+        for i, duration in enumerate(durations):
+            offsets.append(position)
+            padded = duration + self.BATCH_GAP
+            filter_parts.append(
+                f"[{i}:a]aresample=16000,apad=whole_dur={padded:.3f},atrim=end={padded:.3f}[a{i}]"
+            )
+            position += padded
+        
+        inputs = "".join(f"[a{i}]" for i in range(len(audio_paths)))
+        filter_complex = ";".join(filter_parts) + f";{inputs}concat=n={len(audio_paths)}:v=0:a=1[out]"
+        
+        fd, batch_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        
+        try:
+            cmd = ['ffmpeg', '-y']
+            for path in audio_paths:
+                cmd.extend(['-i', path])
+            cmd.extend([
+                '-filter_complex', filter_complex,
+                '-map', '[out]',
+                '-ac', '1',
+                batch_path
+            ])
+            
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            if result.returncode != 0:
+                logger.error(f"FFmpeg stderr: {result.stderr[-1000:]}")
+                raise RuntimeError(f"Failed to join audio for batch transcription: {result.returncode}")
+            
+            logger.info(f"Batch transcribing {len(audio_paths)} files ({position:.2f}s total)")
+            words = self.transcribe_with_timestamps(batch_path)
+        finally:
+            os.unlink(batch_path)
+        
+        # Split words back per file by start offset
+        words_per_file = [[] for _ in audio_paths]
+        for word in words:
+            idx = max(bisect.bisect_right(offsets, word['start']) - 1, 0)
+            offset = offsets[idx]
+            # Words detected in the padding gap would otherwise fall past the clip
+            duration = durations[idx]
+            words_per_file[idx].append({
+                'word': word['word'],
+                'start': min(max(word['start'] - offset, 0.0), duration),
+                'end': min(max(word['end'] - offset, 0.0), duration)
+            })
+        
+        return words_per_file
@@ -1,12 +1,13 @@
 """
 Effects Helper - Ken Burns and Transitions (CapCut-style Dynamic Glitch)
 """
-import random
 import subprocess
 from pathlib import Path
 from typing import Dict, Tuple, List
 import sys
 
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import config
@@ -14,17 +15,30 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Default video encoder args for transition renders
+TRANSITION_VIDEO_ARGS = ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20', '-pix_fmt', 'yuv420p']
+
+
+def _transition_audio(duration: float, audio: bool) -> Tuple[str, List[str]]:
+    """Audio crossfade graph + output args for a transition (video-only inputs: none)"""
+    if not audio:
+        return "", ['-an']
+    return f";[0:a][1:a]acrossfade=d={duration}[a]", ['-map', '[a]', '-c:a', 'aac', '-shortest']
+
+
 
 class KenBurnsEffect:
     """Ken Burns effect - smooth zoom/pan"""
     
     @staticmethod
-    def generate_params() -> Dict:
-        """Generate random Ken Burns parameters"""
-        direction = random.choice(config.KEN_BURNS_DIRECTIONS)
+    def generate_params(rng: np.random.Generator = None) -> Dict:
+        """Generate random Ken Burns parameters (from `rng` for reproducible renders)"""
+        if rng is None:
+            rng = np.random.default_rng()
+        
+        direction = str(rng.choice(config.KEN_BURNS_DIRECTIONS))
         
-        zoom_start = random.uniform(*config.KEN_BURNS_ZOOM_RANGE)
-        zoom_end = random.uniform(*config.KEN_BURNS_ZOOM_RANGE)
+        zoom_start, zoom_end = rng.uniform(*config.KEN_BURNS_ZOOM_RANGE, size=2).tolist()
         
         if abs(zoom_end - zoom_start) < 0.05:
             zoom_end = zoom_start + 0.1
@@ -32,8 +46,7 @@ class KenBurnsEffect:
         if direction == "zoom_out":
             zoom_start, zoom_end = max(zoom_start, zoom_end), min(zoom_start, zoom_end)
         
-        pan_x = random.uniform(*config.KEN_BURNS_PAN_RANGE)
-        pan_y = random.uniform(*config.KEN_BURNS_PAN_RANGE)
+        pan_x, pan_y = rng.uniform(*config.KEN_BURNS_PAN_RANGE, size=2).tolist()
         
         params = {
             'direction': direction,
@@ -104,16 +117,49 @@ class CustomTransitions:
     
     TRANSITIONS = ['glitch', 'flash', 'zoom_punch']
     
+    # Closest built-in xfade transitions (used by single-pass assembly)
+    XFADE_EQUIVALENTS = {
+        'glitch': 'pixelize',
+        'flash': 'fadewhite',
+        'zoom_punch': 'zoomin'
+    }
+    
     @staticmethod
-    def get_random_transition() -> str:
-        return random.choice(CustomTransitions.TRANSITIONS)
+    def get_random_transition(rng: np.random.Generator = None) -> str:
+        if rng is None:
+            rng = np.random.default_rng()
+        return str(rng.choice(CustomTransitions.TRANSITIONS))
+    
+    @staticmethod
+    def generate_params(transition: str, rng: np.random.Generator = None) -> Dict:
+        """Random parameters for the dynamic transitions (empty for the rest)"""
+        if rng is None:
+            rng = np.random.default_rng()
+        
+        if transition == 'glitch':
+            return {
+                'rgb_shift': int(rng.integers(8, 16)),  # More aggressive shift
+                'noise_strength': float(rng.uniform(0.02, 0.05)),  # Add noise
+            }
+        if transition == 'zoom_punch':
+            return {
+                'zoom_start': float(rng.uniform(1.8, 2.5)),  # Start zoomed IN
+                'shake_intensity': int(rng.integers(8, 16)),
+                'blur_amount': float(rng.uniform(0.5, 1.0)),
+            }
+        return {}
     
     @staticmethod
     def apply_glitch_transition(
         clip1_path: str,
         clip2_path: str,
         output_path: str,
-        duration: float = 0.3
+        duration: float = 0.3,
+        video_args: List[str] = None,
+        video_filter: str = '',
+        clip1_duration: float = None,
+        params: Dict = None,
+        audio: bool = True
     ) -> str:
         """
         Dynamic CapCut-style Glitch transition
@@ -127,12 +173,14 @@ class CustomTransitions:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
             return float(result.stdout.strip())
         
-        clip1_dur = get_duration(clip1_path)
+        clip1_dur = clip1_duration if clip1_duration is not None else get_duration(clip1_path)
         offset = clip1_dur - duration
         
         # Dynamic parameters
-        rgb_shift = random.randint(8, 15)  # More aggressive shift
-        noise_strength = random.uniform(0.02, 0.05)  # Add noise
+        if params is None:
+            params = CustomTransitions.generate_params('glitch')
+        rgb_shift = params['rgb_shift']
+        noise_strength = params['noise_strength']
         
         # Build complex glitch effect with multiple layers
         filter_complex = (
@@ -183,22 +231,18 @@ class CustomTransitions:
             f"[v1_glitched][v1_post]concat=n=2:v=1:a=0,settb=AVTB,fps=30[v1_final];"
             
             # === CROSSFADE ===
-            f"[v0_final][v1_final]xfade=transition=fade:duration={duration}:offset={offset}[v]"
+            f"[v0_final][v1_final]xfade=transition=fade:duration={duration}:offset={offset}{video_filter}[v]"
         )
         
+        audio_graph, audio_args = _transition_audio(duration, audio)
         cmd = [
             'ffmpeg', '-y',
             '-i', clip1_path,
             '-i', clip2_path,
-            '-filter_complex', f"{filter_complex};[0:a][1:a]acrossfade=d={duration}[a]",
+            '-filter_complex', filter_complex + audio_graph,
             '-map', '[v]',
-            '-map', '[a]',
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '20',
-            '-pix_fmt', 'yuv420p',
-            '-c:a', 'aac',
-            '-shortest',
+            *(video_args or TRANSITION_VIDEO_ARGS),
+            *audio_args,
             output_path
         ]
         
@@ -216,7 +260,11 @@ class CustomTransitions:
         clip1_path: str,
         clip2_path: str,
         output_path: str,
-        duration: float = 0.3
+        duration: float = 0.3,
+        video_args: List[str] = None,
+        video_filter: str = '',
+        clip1_duration: float = None,
+        audio: bool = True
     ) -> str:
         """White flash transition with normalized timebase"""
         logger.info("Applying flash transition")
@@ -227,29 +275,25 @@ class CustomTransitions:
             result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
             return float(result.stdout.strip())
         
-        clip1_dur = get_duration(clip1_path)
+        clip1_dur = clip1_duration if clip1_duration is not None else get_duration(clip1_path)
         offset = clip1_dur - duration
         
         # Normalize timebase and fps before xfade
         filter_complex = (
             f"[0:v]settb=AVTB,fps=30,fade=t=out:st={offset}:d={duration}:color=white[v0];"
             f"[1:v]settb=AVTB,fps=30,fade=t=in:st=0:d={duration}:color=white[v1];"
-            f"[v0][v1]xfade=transition=fade:duration={duration}:offset={offset}[v]"
+            f"[v0][v1]xfade=transition=fade:duration={duration}:offset={offset}{video_filter}[v]"
         )
         
+        audio_graph, audio_args = _transition_audio(duration, audio)
         cmd = [
             'ffmpeg', '-y',
             '-i', clip1_path,
             '-i', clip2_path,
-            '-filter_complex', f"{filter_complex};[0:a][1:a]acrossfade=d={duration}[a]",
+            '-filter_complex', filter_complex + audio_graph,
             '-map', '[v]',
-            '-map', '[a]',
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '20',
-            '-pix_fmt', 'yuv420p',
-            '-c:a', 'aac',
-            '-shortest',
+            *(video_args or TRANSITION_VIDEO_ARGS),
+            *audio_args,
             output_path
         ]
         
@@ -266,7 +310,12 @@ class CustomTransitions:
         clip1_path: str,
         clip2_path: str,
         output_path: str,
-        duration: float = 0.3
+        duration: float = 0.3,
+        video_args: List[str] = None,
+        video_filter: str = '',
+        clip1_duration: float = None,
+        params: Dict = None,
+        audio: bool = True
     ) -> str:
         """
         Dynamic Zoom Punch - zoom IN to new clip with motion blur and shake
@@ -288,18 +337,20 @@ class CustomTransitions:
             w, h = result.stdout.strip().split(',')
             return int(w), int(h)
         
-        clip1_dur = get_duration(clip1_path)
+        clip1_dur = clip1_duration if clip1_duration is not None else get_duration(clip1_path)
         width, height = get_resolution(clip1_path)
         offset = clip1_dur - duration
         
         # Dynamic parameters
-        zoom_start = random.uniform(1.8, 2.5)  # Start zoomed IN
+        if params is None:
+            params = CustomTransitions.generate_params('zoom_punch')
+        zoom_start = params['zoom_start']
         zoom_end = 1.0  # Zoom OUT to normal
-        shake_intensity = random.randint(8, 15)
+        shake_intensity = params['shake_intensity']
         zoom_frames = int(duration * 30)
         
         # Motion blur simulation using unsharp
-        blur_amount = random.uniform(0.5, 1.0)
+        blur_amount = params['blur_amount']
         
         filter_complex = (
             # === CLIP 1: Normal ===
@@ -344,22 +395,18 @@ class CustomTransitions:
             f"[v_faded]eq="
             f"brightness='if(between(t,{offset},{offset+0.1}),0.3*(1-(t-{offset})/0.1),0)':"
             f"saturation='if(between(t,{offset},{offset+0.15}),1+0.5*(1-(t-{offset})/0.15),1)'"
-            f"[v]"
+            f"{video_filter}[v]"
         )
         
+        audio_graph, audio_args = _transition_audio(duration, audio)
         cmd = [
             'ffmpeg', '-y',
             '-i', clip1_path,
             '-i', clip2_path,
-            '-filter_complex', f"{filter_complex};[0:a][1:a]acrossfade=d={duration}[a]",
+            '-filter_complex', filter_complex + audio_graph,
             '-map', '[v]',
-            '-map', '[a]',
-            '-c:v', 'libx264',
-            '-preset', 'medium',
-            '-crf', '20',
-            '-pix_fmt', 'yuv420p',
-            '-c:a', 'aac',
-            '-shortest',
+            *(video_args or TRANSITION_VIDEO_ARGS),
+            *audio_args,
             output_path
         ]
         
@@ -375,6 +422,10 @@ class CustomTransitions:
 class SubtitleEffect:
     """Subtitle rendering with smooth fade"""
     
+    FADE_DURATION = 0.05  # 50ms fade
+    MIN_GAP = 0.05  # 50ms gap between words
+    MIN_DISPLAY = 0.3  # Минимальное время показа слова
+    
     @staticmethod
     def create_srt_file(words: list, output_path: str) -> str:
         """Create SRT subtitle file"""
@@ -409,18 +460,8 @@ class SubtitleEffect:
         return output_path
     
     @staticmethod
-    def build_subtitle_filter(words: List[dict], resolution: Tuple[int, int]) -> str:
-        """Build drawtext filter with smooth fade in/out"""
-        if not words:
-            return ""
-        
-        font_size = config.SUBTITLE_FONT_SIZE
-        drawtext_filters = []
-        
-        FADE_DURATION = 0.05  # 50ms fade
-        MIN_GAP = 0.05  # 50ms gap between words
-        MIN_DISPLAY = 0.3  # Минимальное время показа слова
-        
+    def _word_timings(words: List[dict]):
+        """Yield (word, start, end) with overlaps removed and minimum display time"""
         prev_end = 0.0
         
         for word_data in words:
@@ -432,14 +473,75 @@ class SubtitleEffect:
             end = word_data['end']
             
             # Ensure no overlap
-            if start < prev_end + MIN_GAP:
-                start = prev_end + MIN_GAP
+            if start < prev_end + SubtitleEffect.MIN_GAP:
+                start = prev_end + SubtitleEffect.MIN_GAP
             
             # Гарантируем минимальное время показа
             duration = end - start
-            if duration < MIN_DISPLAY:
-                end = start + MIN_DISPLAY
+            if duration < SubtitleEffect.MIN_DISPLAY:
+                end = start + SubtitleEffect.MIN_DISPLAY
             
+            yield word, start, end
+            prev_end = end
+    
+    @staticmethod
+    def create_ass_file(words: List[dict], output_path: str, resolution: Tuple[int, int]) -> str:
+        """Create ASS subtitle file: one centered word at a time with fade in/out"""
+        if not words:
+            return None
+        
+        def format_time(seconds):
+            centis = int(round(seconds * 100))
+            hours, centis = divmod(centis, 360000)
+            minutes, centis = divmod(centis, 6000)
+            secs, centis = divmod(centis, 100)
+            return f"{hours:d}:{minutes:02d}:{secs:02d}.{centis:02d}"
+        
+        width, height = resolution
+        fade_ms = int(SubtitleEffect.FADE_DURATION * 1000)
+        
+        lines = [
+            "[Script Info]",
+            "ScriptType: v4.00+",
+            f"PlayResX: {width}",
+            f"PlayResY: {height}",
+            "WrapStyle: 2",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, OutlineColour, BackColour, "
+            "BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV",
+            f"Style: Default,Sans,{config.SUBTITLE_FONT_SIZE},&H00FFFFFF,&H00000000,&H00000000,"
+            f"1,5,0,5,0,0,0",
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+        
+        for word, start, end in SubtitleEffect._word_timings(words):
+            # Braces and backslashes start override tags in ASS
+            text = word.replace('\\', '/').replace('{', '(').replace('}', ')')
+            lines.append(
+                f"Dialogue: 0,{format_time(start)},{format_time(end)},Default,,0,0,0,,"
+                f"{{\\fad({fade_ms},{fade_ms})}}{text}"
+            )
+        
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        
+        return output_path
+    
+    @staticmethod
+    def build_subtitle_filter(words: List[dict], resolution: Tuple[int, int]) -> str:
+        """Build drawtext filter with smooth fade in/out"""
+        if not words:
+            return ""
+        
+        font_size = config.SUBTITLE_FONT_SIZE
+        drawtext_filters = []
+        
+        FADE_DURATION = SubtitleEffect.FADE_DURATION
+        
+        for word, start, end in SubtitleEffect._word_timings(words):
             word_escaped = word.replace('\\', '\\\\').replace("'", "'\\''").replace(':', '\\:').replace('%', '\\%')
             
             # Smooth fade using alpha expression
@@ -463,10 +565,11 @@ class SubtitleEffect:
                 f"bordercolor=black:"
                 f"x=(w-text_w)/2:"
                 f"y=(h-text_h)/2:"
-                f"alpha='{alpha_expr}'"
+                f"alpha='{alpha_expr}':"
+                # Timeline: outside its window the node is bypassed entirely,
+                # so only one drawtext in the chain does work per frame
+                f"enable='between(t,{start:.3f},{end:.3f})'"
             )
             drawtext_filters.append(drawtext)
-            
-            prev_end = end
         
         return ",".join(drawtext_filters) if drawtext_filters else ""
\ No newline at end of file
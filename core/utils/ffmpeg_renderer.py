@@ -15,11 +15,55 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Raw pixel formats accepted on stdin
+PIPE_PIX_FMTS = ('rgb24', 'yuv420p', 'nv12')
+
+
+def rgb_to_yuv420p(frame: np.ndarray) -> np.ndarray:
+    """
+    Convert RGB frame to planar YUV420P (BT.601, limited range)
+    
+    Matches ffmpeg's default rgb24 -> yuv420p conversion, so callers can
+    switch a renderer to pix_fmt='yuv420p' without a color shift.
+    
+    Args:
+        frame: RGB numpy array (height, width, 3), even dimensions
+        
+    Returns:
+        uint8 array (height * 3 // 2, width): Y plane, then U, then V
+    """
+    height, width = frame.shape[:2]
+    rgb = frame.astype(np.float32)
+    r, g, b = rgb[:, :, 0], rgb[:, :, 1], rgb[:, :, 2]
+    
+    out = np.empty((height * 3 // 2, width), dtype=np.uint8)
+    out[:height] = np.clip(0.257 * r + 0.504 * g + 0.098 * b + 16.5, 0, 255)
+    
+    # Chroma from the 2x2 block average
+    rgb_sub = rgb.reshape(height // 2, 2, width // 2, 2, 3).mean(axis=(1, 3))
+    r, g, b = rgb_sub[:, :, 0], rgb_sub[:, :, 1], rgb_sub[:, :, 2]
+    u = np.clip(-0.148 * r - 0.291 * g + 0.439 * b + 128.5, 0, 255)
+    v = np.clip(0.439 * r - 0.368 * g - 0.071 * b + 128.5, 0, 255)
+    
+    chroma = out.reshape(-1)[height * width:]
+    chroma[:u.size] = u.ravel()
+    chroma[u.size:] = v.ravel()
+    return out
+
 
 class FFmpegRenderer:
     """Direct FFmpeg renderer with GPU acceleration"""
     
-    def __init__(self, output_path: str, resolution: Tuple[int, int], fps: int = None):
+    # vainfo result, shared by all renderers (probed once per process)
+    _vaapi_available = None
+    
+    def __init__(
+        self,
+        output_path: str,
+        resolution: Tuple[int, int],
+        fps: int = None,
+        pix_fmt: str = 'rgb24'
+    ):
         """
         Initialize FFmpeg renderer
         
@@ -27,27 +71,61 @@ class FFmpegRenderer:
             output_path: Output video file path
             resolution: (width, height)
             fps: Frames per second
+            pix_fmt: Raw frame format: 'rgb24' (height, width, 3) or
+                'yuv420p' / 'nv12' (height * 3 // 2, width) - half the pipe traffic
         """
+        if pix_fmt not in PIPE_PIX_FMTS:
+            raise ValueError(f"Unsupported pix_fmt: {pix_fmt}")
+        
         self.output_path = output_path
         self.width, self.height = resolution
         self.fps = fps or config.DEFAULT_FPS
+        self.pix_fmt = pix_fmt
         self.process = None
         self.frames_written = 0
         
+        if pix_fmt == 'rgb24':
+            self.frame_shape = (self.height, self.width, 3)
+        else:
+            self.frame_shape = (self.height * 3 // 2, self.width)
+        
+        # Scratch buffer for frames that are not C-contiguous uint8
+        self._scratch = np.empty(self.frame_shape, dtype=np.uint8)
+        self._scratch_view = memoryview(self._scratch).cast('B')
+        
         logger.info(f"FFmpegRenderer: {self.width}x{self.height} @ {self.fps}fps")
     
     def detect_vaapi(self) -> bool:
         """Test if VAAPI is available"""
+        if FFmpegRenderer._vaapi_available is None:
+            try:
+                result = subprocess.run(
+                    ['vainfo'],
+                    capture_output=True,
+                    text=True,
+                    timeout=5
+                )
+                FFmpegRenderer._vaapi_available = result.returncode == 0
+            except:
+                FFmpegRenderer._vaapi_available = False
+        
+        return FFmpegRenderer._vaapi_available
+    
+    def _raise_pipe_size(self, size: int = 1 << 20):
+        """Grow the kernel stdin pipe (Linux only, default is 64KB)"""
+        if not sys.platform.startswith('linux'):
+            return
+        
+        F_SETPIPE_SZ = 1031
+        
         try:
-            result = subprocess.run(
-                ['vainfo'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except:
-            return False
+            import fcntl
+            
+            # Unprivileged processes are capped by pipe-max-size
+            max_size = int(Path('/proc/sys/fs/pipe-max-size').read_text().strip())
+            fcntl.fcntl(self.process.stdin.fileno(), F_SETPIPE_SZ, min(size, max_size))
+        except Exception as e:
+            logger.debug(f"Could not raise pipe size: {e}")
     
     def start(self, audio_path: Optional[str] = None) -> subprocess.Popen:
         """
@@ -72,7 +150,7 @@ class FFmpegRenderer:
                 '-f', 'rawvideo',
                 '-vcodec', 'rawvideo',
                 '-s', f'{self.width}x{self.height}',
-                '-pix_fmt', 'rgb24',
+                '-pix_fmt', self.pix_fmt,
                 '-r', str(self.fps),
                 '-i', '-',  # stdin
             ]
@@ -83,9 +161,9 @@ class FFmpegRenderer:
             
             # VAAPI encoding
             cmd.extend([
-                '-init_hw_device', 'vaapi=va:/dev/dri/renderD128',
+                '-init_hw_device', f'vaapi=va:{config.VAAPI_DEVICE}',
                 '-filter_hw_device', 'va',
-                '-vf', 'format=nv12,hwupload',
+                '-vf', 'hwupload' if self.pix_fmt == 'nv12' else 'format=nv12,hwupload',
                 '-c:v', 'h264_vaapi',
                 '-qp', '26',
                 '-c:a', 'aac' if audio_path else 'none',
@@ -102,7 +180,7 @@ class FFmpegRenderer:
                 '-f', 'rawvideo',
                 '-vcodec', 'rawvideo',
                 '-s', f'{self.width}x{self.height}',
-                '-pix_fmt', 'rgb24',
+                '-pix_fmt', self.pix_fmt,
                 '-r', str(self.fps),
                 '-i', '-',
             ]
@@ -130,8 +208,11 @@ class FFmpegRenderer:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                bufsize=10**8  # 100MB buffer
+                # Unbuffered: frames go straight into the (enlarged) kernel
+                # pipe instead of being copied into a userspace buffer first
+                bufsize=0
             )
+            self._raise_pipe_size()
             
             # Check if process started successfully
             import time
@@ -150,12 +231,19 @@ class FFmpegRenderer:
             logger.error(f"Failed to start FFmpeg: {e}", exc_info=True)
             raise
     
+    def _write_all(self, data: memoryview) -> None:
+        """Write a whole buffer to the unbuffered stdin pipe (handles partial writes)"""
+        write = self.process.stdin.write
+        while data:
+            written = write(data)
+            data = data[written:]
+    
     def write_frame(self, frame: np.ndarray) -> bool:
         """
         Write single frame to FFmpeg
         
         Args:
-            frame: RGB numpy array (height, width, 3)
+            frame: Frame array in the renderer's pix_fmt layout
             
         Returns:
             Success status
@@ -175,22 +263,20 @@ class FFmpegRenderer:
         
         try:
             # Ensure correct shape and type
-            if frame.shape != (self.height, self.width, 3):
-                logger.error(f"Frame shape mismatch: {frame.shape} != {(self.height, self.width, 3)}")
+            if frame.shape != self.frame_shape:
+                logger.error(f"Frame shape mismatch: {frame.shape} != {self.frame_shape}")
                 return False
             
-            if frame.dtype != np.uint8:
-                frame = frame.astype(np.uint8)
+            # Write raw frame data straight from the frame buffer when possible
+            if frame.dtype == np.uint8 and frame.flags.c_contiguous:
+                data = memoryview(frame).cast('B')
+            else:
+                np.copyto(self._scratch, frame, casting='unsafe')
+                data = self._scratch_view
             
-            # Write raw RGB data
             try:
-                self.process.stdin.write(frame.tobytes())
+                self._write_all(data)
                 self.frames_written += 1
-                
-                # Flush every 30 frames to prevent buffer buildup
-                if self.frames_written % 30 == 0:
-                    self.process.stdin.flush()
-                
                 return True
             except BrokenPipeError:
                 logger.error("FFmpeg pipe broken - process may have crashed")
@@ -206,21 +292,49 @@ class FFmpegRenderer:
             logger.error(f"Failed to write frame {self.frames_written}: {e}", exc_info=True)
             return False
     
+    def _make_writer(self):
+        """
+        Build a per-frame writer for the current process
+        
+        Well-formed frames (right shape, C-contiguous uint8) go straight to
+        the pipe; anything else, and pipe errors, take the checked
+        write_frame path so diagnostics are unchanged.
+        """
+        if self.process is None:
+            raise RuntimeError("FFmpeg process not started")
+        
+        write_all = self._write_all
+        expected_shape = self.frame_shape
+        uint8 = np.dtype(np.uint8)
+        
+        def write(frame: np.ndarray) -> bool:
+            if frame.shape == expected_shape and frame.dtype == uint8 and frame.flags.c_contiguous:
+                try:
+                    write_all(memoryview(frame).cast('B'))
+                    self.frames_written += 1
+                    return True
+                except (BrokenPipeError, ValueError):
+                    pass
+            return self.write_frame(frame)
+        
+        return write
+    
     def write_frames(self, frame_generator: Generator[np.ndarray, None, None]) -> int:
         """
         Write multiple frames from generator
         
         Args:
-            frame_generator: Generator yielding RGB frames
+            frame_generator: Generator yielding frames in the renderer's pix_fmt layout
             
         Returns:
             Number of frames written
         """
         count = 0
+        write = self._make_writer()
         
         try:
             for frame in frame_generator:
-                if not self.write_frame(frame):
+                if not write(frame):
                     break
                 count += 1
                 
@@ -234,6 +348,67 @@ class FFmpegRenderer:
             logger.error(f"Frame generation error: {e}")
             return count
     
+    def write_frames_batched(
+        self,
+        frame_generator: Generator[np.ndarray, None, None],
+        batch: int = 8
+    ) -> int:
+        """
+        Write frames from generator in batches of `batch` frames per write
+        
+        Args:
+            frame_generator: Generator yielding frames in the renderer's pix_fmt layout
+            batch: Frames per pipe write
+            
+        Returns:
+            Number of frames written
+        """
+        if self.process is None:
+            raise RuntimeError("FFmpeg process not started")
+        
+        expected_shape = self.frame_shape
+        buf = np.empty((batch, *expected_shape), dtype=np.uint8)
+        count = 0
+        filled = 0
+        
+        def flush_batch(n: int) -> bool:
+            try:
+                self._write_all(memoryview(buf[:n]).cast('B'))
+                self.frames_written += n
+                return True
+            except BrokenPipeError:
+                logger.error("FFmpeg pipe broken - process may have crashed")
+                return False
+        
+        try:
+            for frame in frame_generator:
+                if frame.shape != expected_shape:
+                    logger.error(f"Frame shape mismatch: {frame.shape} != {expected_shape}")
+                    break
+                
+                np.copyto(buf[filled], frame, casting='unsafe')
+                filled += 1
+                
+                if filled == batch:
+                    if not flush_batch(filled):
+                        return count
+                    count += filled
+                    filled = 0
+                    
+                    if count % 100 < batch:
+                        logger.debug(f"Written {count} frames")
+            
+            # Flush partial batch
+            if filled and flush_batch(filled):
+                count += filled
+            
+            logger.info(f"✓ Wrote {count} frames total")
+            return count
+            
+        except Exception as e:
+            logger.error(f"Frame generation error: {e}")
+            return count
+    
     def finish(self) -> bool:
         """
         Finalize video and close FFmpeg
@@ -305,9 +480,12 @@ def test_renderer():
     
     def generate_test_frames():
         """Generate 48 frames (2 seconds) of gradient"""
+        # One buffer filled in place - write_frame copies it into the pipe
+        # before the next frame is produced
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        red = frame[:, :, 0]
         for i in range(48):
-            frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
-            frame[:, :, 0] = int((i / 48) * 255)  # Red gradient
+            red.fill(int((i / 48) * 255))  # Red gradient
             yield frame
     
     renderer.start()
@@ -0,0 +1,75 @@
+"""
+VideoService render reproducibility (ffmpeg calls are recorded, not run)
+"""
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import config
+from core.models.slide import Slide
+from core.services.video_service import VideoService
+
+
+@pytest.fixture
+def ffmpeg_calls(monkeypatch):
+    """Replace subprocess.run with a fake ffmpeg that records filter graphs"""
+    filters = {}
+
+    def fake_run(cmd, *args, **kwargs):
+        if cmd[0] == 'ffprobe':
+            stdout = "1080,1920" if 'stream=width,height' in cmd else "1.0"
+            return SimpleNamespace(returncode=0, stdout=stdout, stderr="")
+
+        output = Path(cmd[-1])
+        if '-filter_complex' in cmd:
+            filters[output.name] = cmd[cmd.index('-filter_complex') + 1]
+        if output.suffix == '.mp4':
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.touch()
+        return SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    monkeypatch.setattr(config, 'TEMP_ON_TMPFS', False)
+    monkeypatch.setattr(config, 'PREDECODE_IMAGES', False)
+    monkeypatch.setattr(config, 'SINGLE_PROCESS_SLIDES', False)
+    monkeypatch.setattr(config, 'ENABLE_KEN_BURNS', True)
+    # Several workers for both slides and transition joints
+    monkeypatch.setattr(VideoService, '_encoder', 'libx264')
+    monkeypatch.setattr(VideoService, '_cpus', 8)
+    return filters
+
+
+def make_slides(directory: Path, count: int):
+    slides = []
+    for i in range(count):
+        image = directory / f"image_{i}.jpg"
+        audio = directory / f"audio_{i}.mp3"
+        image.touch()
+        audio.touch()
+        slides.append(Slide(text=f"Slide {i}", image_path=str(image), audio_path=str(audio), duration=5.0))
+    return slides
+
+
+def test_same_seed_renders_same_filters(tmp_path, ffmpeg_calls):
+    slides = make_slides(tmp_path, 6)
+    service = VideoService((1080, 1920))
+
+    runs = []
+    for run in range(2):
+        ffmpeg_calls.clear()
+        output = tmp_path / f"run_{run}" / "video.mp4"
+        output.parent.mkdir()
+        service.assemble_video(slides, str(output), seed=1234)
+        runs.append(dict(ffmpeg_calls))
+
+    assert any(name.startswith('slide_') for name in runs[0])
+    assert any(name.startswith('joint_') for name in runs[0])
+    assert runs[0] == runs[1]
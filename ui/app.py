@@ -1,10 +1,13 @@
 """Streamlit UI - calls backend API"""
 import streamlit as st
-import requests
 import uuid
 import time
+import math
+import shutil
+import json
+import io
+import threading
 from pathlib import Path
-from PIL import Image
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -12,17 +15,79 @@ import os
 import config
 from core.utils.logger import setup_logger, get_logger
 
+# orjson is optional - faster (de)serialization for API payloads
+try:
+    import orjson
+    json_loads, json_dumps = orjson.loads, orjson.dumps
+except ImportError:
+    json_loads = json.loads
+    
+    def json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
 # Setup logging
+# setup_logger creates logs/ itself, and only on first configuration
 log_file = Path("logs/ui.log")
-log_file.parent.mkdir(parents=True, exist_ok=True)
 setup_logger("root", str(log_file))
 logger = get_logger(__name__)
 
 # API Configuration
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000/api/v1")
+# Backend URL as reachable from the browser (video playback / download links);
+# unset: Streamlit serves the video from the shared output directory
+API_PUBLIC_URL = os.getenv("API_PUBLIC_URL")
+# (connect, read) timeouts - keep a slow backend from stalling the script run
+API_TIMEOUT = (2, 5)
+API_SUBMIT_TIMEOUT = (3, 10)
+# The status stream sends a keepalive every few seconds - silence this long
+# means the connection is dead, so fall back to polling
+API_STREAM_TIMEOUT = (API_TIMEOUT[0], 30)
+
+# Slide expanders rendered per page
+SLIDES_PER_PAGE = 10
+
+
+@st.cache_resource
+def get_session():
+    """Shared HTTP session (keep-alive pool reused across reruns)"""
+    # Imported here: runs once per server process, not at script start
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        # Bounded budget: connect failures are retried for every method (the
+        # request never reached the backend), read/status retries only for
+        # idempotent methods - job submission is never resent
+        max_retries=Retry(
+            total=2,
+            connect=2,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504]
+        )
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    def preconnect():
+        # Any response leaves a keep-alive socket in the pool
+        try:
+            session.head(API_BASE_URL, timeout=1)
+        except Exception:
+            pass
+    
+    # Open the first connection while the page header renders
+    threading.Thread(target=preconnect, daemon=True).start()
+    return session
+
 
 # Page config
 st.set_page_config(page_title="AI Video Generator", page_icon="🎬", layout="wide")
+get_session()
 
 # Session state
 if 'slides' not in st.session_state:
@@ -33,55 +98,70 @@ if 'current_job_id' not in st.session_state:
     st.session_state.current_job_id = None
 if 'generated_video_path' not in st.session_state:
     st.session_state.generated_video_path = None
-if 'voices_cache' not in st.session_state:
-    st.session_state.voices_cache = None
-if 'languages_cache' not in st.session_state:
-    st.session_state.languages_cache = None
+if 'generated_job_id' not in st.session_state:
+    st.session_state.generated_job_id = None
 
 
 def get_cache_dir(generation_id: str) -> Path:
-    cache_dir = Path("cache") / generation_id
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir
+    return Path("cache") / generation_id
+
+
+def get_images_dir(generation_id: str) -> Path:
+    """Images directory for a generation (created once per session)"""
+    images_dirs = st.session_state.setdefault('images_dirs', {})
+    
+    if generation_id not in images_dirs:
+        images_dir = get_cache_dir(generation_id) / "images"
+        images_dir.mkdir(parents=True, exist_ok=True)
+        images_dirs[generation_id] = images_dir
+    
+    return images_dirs[generation_id]
 
 
 def save_uploaded_image(uploaded_file, generation_id: str) -> str:
-    cache_dir = get_cache_dir(generation_id)
-    images_dir = cache_dir / "images"
-    images_dir.mkdir(exist_ok=True)
+    images_dir = get_images_dir(generation_id)
+    
+    # Generation directory is already unique - a session counter (never
+    # reused after deletes) keeps names short and in upload order
+    index = st.session_state.get('image_counter', 0)
+    st.session_state.image_counter = index + 1
     
     file_ext = Path(uploaded_file.name).suffix
-    filename = f"{uuid.uuid4()}{file_ext}"
+    filename = f"{index:04d}{file_ext}"
     file_path = images_dir / filename
     
+    # Stream in chunks instead of materializing the whole upload
+    uploaded_file.seek(0)
     with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+        shutil.copyfileobj(uploaded_file, f, length=1 << 16)
     
     logger.info(f"Image saved: {filename}")
     return str(file_path)
 
 
+@st.cache_data(ttl=3600, show_spinner="Loading languages...")
 def api_get_languages():
-    """Get languages from API"""
+    """Get languages from API (cached across reruns)"""
     try:
-        response = requests.get(f"{API_BASE_URL}/languages", timeout=10)
+        response = get_session().get(f"{API_BASE_URL}/languages", timeout=API_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
     except Exception as e:
         logger.error(f"Failed to get languages: {e}")
         return []
 
 
+@st.cache_data(ttl=3600, show_spinner="Loading voices...")
 def api_get_voices(language: str):
-    """Get voices from API"""
+    """Get voices from API (cached per language across reruns)"""
     try:
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/voices",
             params={"language": language},
-            timeout=10
+            timeout=API_TIMEOUT
         )
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
     except Exception as e:
         logger.error(f"Failed to get voices: {e}")
         return []
@@ -101,17 +181,18 @@ def api_generate_video(slides_data, voice, resolution):
         
         logger.info(f"Submitting job with payload: {payload}")
         
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/manual/generate",
-            json=payload,
-            timeout=30
+            data=json_dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=API_SUBMIT_TIMEOUT
         )
         
         if response.status_code != 200:
             logger.error(f"API error {response.status_code}: {response.text}")
         
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
     except Exception as e:
         logger.error(f"Failed to submit job: {e}")
         raise
@@ -119,141 +200,97 @@ def api_generate_video(slides_data, voice, resolution):
 def api_get_job_status(job_id: str):
     """Get job status from API"""
     try:
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/status/{job_id}",
-            timeout=10
+            timeout=API_TIMEOUT
         )
         response.raise_for_status()
-        return response.json()
+        return json_loads(response.content)
     except Exception as e:
         logger.error(f"Failed to get job status: {e}")
         return None
 
 
-def poll_job_status(job_id: str):
-    """Poll job status until completion"""
-    progress_bar = st.progress(0)
-    status_text = st.empty()
+def api_stream_job_status(job_id: str):
+    """
+    Yield job status updates from the SSE endpoint
     
-    while True:
-        status = api_get_job_status(job_id)
-        
-        if not status:
-            status_text.error("Failed to get job status")
-            break
-        
-        progress = status.get('progress', 0)
-        current_step = status.get('current_step', 'Processing...')
-        
-        progress_bar.progress(progress)
-        status_text.text(f"Status: {status['status']} - {current_step}")
-        
-        if status['status'] == 'completed':
-            status_text.success("✅ Video generation completed!")
-            return status['video_path']
-        
-        elif status['status'] == 'failed':
-            error = status.get('error', 'Unknown error')
-            status_text.error(f"❌ Generation failed: {error}")
-            return None
+    Raises requests.HTTPError (e.g. 404 on backends without the stream route)
+    before the first update, and requests.ReadTimeout when the stream goes
+    silent, so callers can fall back to polling. Keepalive comments are skipped.
+    """
+    with get_session().get(
+        f"{API_BASE_URL}/status/{job_id}/stream",
+        stream=True,
+        timeout=API_STREAM_TIMEOUT
+    ) as response:
+        response.raise_for_status()
         
-        time.sleep(1)
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            yield json_loads(line[5:])
 
 
-# Main UI
-st.title("🎬 AI Video Generator")
-st.markdown("Generate short-form videos with AI-powered voiceover and subtitles")
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_video_bytes(path: str, mtime: float) -> bytes:
+    """Read video file once per (path, mtime) instead of on every rerun"""
+    with open(path, 'rb') as f:
+        return f.read()
 
-# Sidebar - Configuration
-with st.sidebar:
-    st.header("⚙️ Configuration")
-    st.subheader("Voice Settings")
-    
-    selected_voice = None
-    
-    if st.session_state.languages_cache is None:
-        with st.spinner("Loading languages..."):
-            st.session_state.languages_cache = api_get_languages()
-    
-    if st.session_state.languages_cache:
-        selected_language = st.selectbox(
-            "Language",
-            st.session_state.languages_cache,
-            index=0
-        )
-        
-        if st.button("Load Voices") or st.session_state.voices_cache is not None:
-            if st.session_state.voices_cache is None:
-                with st.spinner("Loading voices..."):
-                    voices = api_get_voices(selected_language)
-                    st.session_state.voices_cache = voices
-        
-        if st.session_state.voices_cache:
-            voice_options = {
-                f"{v['short_name']} ({v.get('gender', 'Unknown')})": v['short_name']
-                for v in st.session_state.voices_cache
-            }
-            
-            if voice_options:
-                selected_voice_display = st.selectbox("Voice", list(voice_options.keys()))
-                selected_voice = voice_options[selected_voice_display]
-            else:
-                st.warning("No voices available")
-        else:
-            if st.session_state.voices_cache is not None:
-                st.info("Click 'Load Voices'")
-    else:
-        st.error("Failed to load languages")
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def load_thumbnail(path: str, mtime: float) -> bytes:
+    """Decode and shrink a slide image once per (path, mtime)"""
+    # PIL is only needed once slides exist
+    from PIL import Image
     
-    st.subheader("Video Settings")
-    resolution_choice = st.radio(
-        "Resolution",
-        list(config.VIDEO_RESOLUTIONS.keys()),
-        index=0
-    )
+    with Image.open(path) as img:
+        img = img.convert('RGB')
+        img.thumbnail((256, 256))
+        buf = io.BytesIO()
+        img.save(buf, "JPEG", quality=80)
+    return buf.getvalue()
 
-# Main Content
-st.header("📝 Manual Upload Mode")
 
-with st.form("slide_form", clear_on_submit=True):
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        slide_text = st.text_area("Slide Text", placeholder="Enter text...", height=150)
+@st.cache_data(ttl=2, show_spinner=False)
+def read_log_tail(path: str, size: int, lines: int = 100) -> str:
+    """Last `lines` lines of a log, reading at most the final 64 KiB"""
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - 65536))
+        tail = f.read().decode('utf-8', 'replace')
+    return "\n".join(tail.splitlines()[-lines:])
+
+
+# st.fragment (experimental_fragment before 1.37); plain rerun without it
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda f: f)
+
+
+def delete_slide(index: int):
+    """Delete-button callback (runs before the rerun)"""
+    st.session_state.slides.pop(index)
+
+
+@fragment
+def render_slides_list():
+    """Slide expanders - delete reruns only this fragment"""
+    if not st.session_state.slides:
+        # Last slide gone - the rest of the page changes too
+        st.rerun()
     
-    with col2:
-        uploaded_image = st.file_uploader(
-            "Upload Image",
-            type=config.ALLOWED_IMAGE_EXTENSIONS
-        )
+    slides = st.session_state.slides
+    pages = math.ceil(len(slides) / SLIDES_PER_PAGE)
+    page = 1
     
-    submitted = st.form_submit_button("➕ Add Slide", type="primary")
+    if pages > 1:
+        # Deleting can leave the remembered page past the end
+        if st.session_state.get('slides_page', 1) > pages:
+            st.session_state.slides_page = pages
+        page = st.number_input("Page", min_value=1, max_value=pages, key='slides_page')
     
-    if submitted:
-        if not slide_text or not slide_text.strip():
-            st.error("Please enter text")
-        elif not uploaded_image:
-            st.error("Please upload an image")
-        else:
-            if st.session_state.generation_id is None:
-                st.session_state.generation_id = str(uuid.uuid4())
-            
-            image_path = save_uploaded_image(uploaded_image, st.session_state.generation_id)
-            
-            st.session_state.slides.append({
-                'text': slide_text.strip(),
-                'image_path': image_path,
-                'image_name': uploaded_image.name
-            })
-            
-            st.success(f"✅ Slide {len(st.session_state.slides)} added!")
-            st.rerun()
-
-# Display slides
-if st.session_state.slides:
-    st.header("📋 Slides List")
+    first = (page - 1) * SLIDES_PER_PAGE
     
-    for i, slide in enumerate(st.session_state.slides):
+    for i, slide in enumerate(slides[first:first + SLIDES_PER_PAGE], start=first):
         with st.expander(f"Slide {i+1}: {slide['text'][:50]}..."):
             col1, col2 = st.columns([3, 1])
             
@@ -262,28 +299,84 @@ if st.session_state.slides:
             
             with col2:
                 try:
-                    img = Image.open(slide['image_path'])
-                    st.image(img, caption=slide['image_name'], use_column_width=True)
+                    thumbnail = load_thumbnail(slide['image_path'], os.path.getmtime(slide['image_path']))
+                    st.image(thumbnail, caption=slide['image_name'], use_column_width=True)
                 except Exception as e:
                     st.error(f"Failed to load image: {e}")
                 
-                if st.button("🗑️ Delete", key=f"delete_{i}"):
-                    st.session_state.slides.pop(i)
-                    st.rerun()
+                st.button("🗑️ Delete", key=f"delete_{i}", on_click=delete_slide, args=(i,))
     
-    st.divider()
-    col1, col2, col3 = st.columns([2, 1, 1])
+    st.info(f"Total slides: {len(st.session_state.slides)}")
+
+
+def poll_job_status(job_id: str):
+    """Follow job status until completion (SSE stream, polling fallback)"""
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    last_shown = None
     
-    with col1:
-        st.info(f"Total slides: {len(st.session_state.slides)}")
+    def show(status):
+        """Render status; returns True when the job has finished"""
+        nonlocal last_shown
+        progress = status.get('progress') or 0
+        current_step = status.get('current_step') or 'Processing...'
+        
+        # Only send a UI delta when something visible changed
+        shown = (progress, status['status'], current_step)
+        if shown != last_shown:
+            progress_bar.progress(progress)
+            status_text.text(f"Status: {status['status']} - {current_step}")
+            last_shown = shown
+        
+        if status['status'] == 'completed':
+            status_text.success("✅ Video generation completed!")
+            return True
+        
+        elif status['status'] == 'failed':
+            error = status.get('error', 'Unknown error')
+            status_text.error(f"❌ Generation failed: {error}")
+            return True
+        
+        return False
     
-    with col2:
+    # A silent stream raises ReadTimeout before the first byte and
+    # ConnectionError (wrapping the read timeout) once streaming
+    from requests.exceptions import ConnectionError as StreamConnectionError, ReadTimeout
+    
+    try:
+        for status in api_stream_job_status(job_id):
+            if show(status):
+                return status['video_path'] if status['status'] == 'completed' else None
+    except (ReadTimeout, StreamConnectionError) as e:
+        logger.info(f"Status stream went silent or dropped, polling instead: {e}")
+    except Exception as e:
+        logger.info(f"Status stream unavailable, polling instead: {e}")
+    
+    while True:
+        status = api_get_job_status(job_id)
+        
+        if not status:
+            status_text.error("Failed to get job status")
+            break
+        
+        if show(status):
+            return status['video_path'] if status['status'] == 'completed' else None
+        
+        time.sleep(1)
+
+
+@fragment
+def render_generation_panel(selected_voice, resolution_choice):
+    """Clear / Generate buttons and job progress - reruns without the sidebar"""
+    col1, col2 = st.columns(2)
+    
+    with col1:
         if st.button("🗑️ Clear All", use_container_width=True):
             st.session_state.slides = []
             st.session_state.generation_id = None
             st.rerun()
     
-    with col3:
+    with col2:
         generate_button = st.button(
             "🎬 Generate Video",
             type="primary",
@@ -322,12 +415,135 @@ if st.session_state.slides:
                     video_path = poll_job_status(job_id)
                     
                     if video_path:
+                        # Job that produced the shown video (current_job_id
+                        # moves on as soon as another job is submitted)
                         st.session_state.generated_video_path = video_path
+                        st.session_state.generated_job_id = job_id
                         st.rerun()
                     
                 except Exception as e:
                     st.error(f"Failed: {str(e)}")
                     logger.error(f"Generation error: {e}", exc_info=True)
+
+
+# Main UI
+st.title("🎬 AI Video Generator")
+st.markdown("Generate short-form videos with AI-powered voiceover and subtitles")
+
+# Sidebar - Configuration
+with st.sidebar:
+    st.header("⚙️ Configuration")
+    st.subheader("Voice Settings")
+    
+    selected_voice = None
+    
+    last_language = st.session_state.get('last_language')
+    languages = api_get_languages()
+    
+    if languages:
+        selected_language = st.selectbox(
+            "Language",
+            languages,
+            index=languages.index(last_language) if last_language in languages else 0
+        )
+        st.session_state.last_language = selected_language
+        
+        voices = api_get_voices(selected_language)
+        
+        voice_options = {
+            f"{v['short_name']} ({v.get('gender', 'Unknown')})": v['short_name']
+            for v in voices
+        }
+        
+        if voice_options:
+            selected_voice_display = st.selectbox("Voice", list(voice_options.keys()))
+            selected_voice = voice_options[selected_voice_display]
+        else:
+            # Don't keep a failed/empty lookup cached for the whole TTL
+            api_get_voices.clear()
+            st.warning("No voices available")
+        
+        if st.button("Refresh voices"):
+            api_get_voices.clear()
+            st.rerun()
+    else:
+        api_get_languages.clear()
+        st.error("Failed to load languages")
+    
+    st.subheader("Video Settings")
+    resolution_choice = st.radio(
+        "Resolution",
+        list(config.VIDEO_RESOLUTIONS.keys()),
+        index=0
+    )
+
+# Main Content
+st.header("📝 Manual Upload Mode")
+
+with st.form("slide_form", clear_on_submit=True):
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        slide_text = st.text_area(
+            "Slide Text",
+            placeholder="Enter text (one line per slide when uploading several images)...",
+            help="With one image the whole text is the slide. With several images each "
+                 "non-empty line becomes a slide, paired with images in upload order",
+            height=150
+        )
+    
+    with col2:
+        uploaded_images = st.file_uploader(
+            "Upload Images",
+            type=config.ALLOWED_IMAGE_EXTENSIONS,
+            accept_multiple_files=True
+        )
+    
+    submitted = st.form_submit_button("➕ Add Slides", type="primary")
+    
+    if submitted:
+        text = (slide_text or "").strip()
+        
+        # Several images: one slide per line; one image keeps line breaks in its text
+        if uploaded_images and len(uploaded_images) > 1:
+            texts = [t.strip() for t in text.splitlines() if t.strip()]
+        else:
+            texts = [text] if text else []
+        
+        if not texts:
+            st.error("Please enter text")
+        elif not uploaded_images:
+            st.error("Please upload an image")
+        elif len(texts) != len(uploaded_images):
+            st.error(
+                f"Got {len(texts)} text lines but {len(uploaded_images)} images - "
+                "enter one line per image"
+            )
+        else:
+            if st.session_state.generation_id is None:
+                st.session_state.generation_id = str(uuid.uuid4())
+            
+            # Add the whole batch, then rerun once
+            for text, uploaded_image in zip(texts, uploaded_images):
+                image_path = save_uploaded_image(uploaded_image, st.session_state.generation_id)
+                
+                st.session_state.slides.append({
+                    'text': text,
+                    'image_path': image_path,
+                    'image_name': uploaded_image.name
+                })
+            
+            st.success(f"✅ {len(texts)} slide(s) added!")
+            st.rerun()
+
+# Display slides
+if st.session_state.slides:
+    st.header("📋 Slides List")
+    
+    render_slides_list()
+    
+    st.divider()
+    render_generation_panel(selected_voice, resolution_choice)
 else:
     st.info("👆 Add slides above to get started")
 
@@ -341,21 +557,34 @@ if st.session_state.generated_video_path:
     if video_path.exists():
         col1, col2, col3 = st.columns([1, 2, 1])
         
+        job_id = st.session_state.generated_job_id
+        
         with col2:
-            with open(video_path, 'rb') as video_file:
-                video_bytes = video_file.read()
-                st.video(video_bytes)
+            if API_PUBLIC_URL:
+                # Browser streams from the backend (Range requests) - no bytes
+                # go through Streamlit
+                st.video(f"{API_PUBLIC_URL}/video/{job_id}")
+            else:
+                # Streamlit serves the file itself - no Python-side copy
+                st.video(str(video_path))
         
         col1, col2 = st.columns([1, 3])
         
         with col1:
-            st.download_button(
-                label="⬇️ Download Video",
-                data=video_bytes,
-                file_name=video_path.name,
-                mime="video/mp4",
-                use_container_width=True
-            )
+            if API_PUBLIC_URL:
+                st.link_button(
+                    "⬇️ Download Video",
+                    f"{API_PUBLIC_URL}/download/{job_id}",
+                    use_container_width=True
+                )
+            else:
+                st.download_button(
+                    label="⬇️ Download Video",
+                    data=load_video_bytes(str(video_path), video_path.stat().st_mtime),
+                    file_name=video_path.name,
+                    mime="video/mp4",
+                    use_container_width=True
+                )
         
         with col2:
             file_size_mb = video_path.stat().st_size / (1024 * 1024)
@@ -369,10 +598,8 @@ with st.expander("📋 View Logs"):
     log_file_path = Path("logs/ui.log")
     if log_file_path.exists():
         try:
-            with open(log_file_path, 'r') as f:
-                logs = f.readlines()
-                recent_logs = ''.join(logs[-100:])
-                st.text_area("Recent Logs", value=recent_logs, height=400, disabled=True)
+            recent_logs = read_log_tail(str(log_file_path), log_file_path.stat().st_size)
+            st.text_area("Recent Logs", value=recent_logs, height=400, disabled=True)
         except Exception as e:
             st.error(f"Failed to load logs: {e}")
     else: